@@ -0,0 +1,99 @@
+"""Add archive tables
+
+Revision ID: a6f1c9d3e852
+Revises: e2c5a8f47b13
+Create Date: 2026-10-19 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6f1c9d3e852'
+down_revision: Union[str, None] = 'e2c5a8f47b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('archived_ai_conversations',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_ai_conversations_user_id'), 'archived_ai_conversations', ['user_id'], unique=False)
+    op.create_table('archived_tasks',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('priority', sa.Enum('HIGH', 'MEDIUM', 'LOW', name='priority', native_enum=False), nullable=True),
+    sa.Column('due_date', sa.Date(), nullable=True),
+    sa.Column('status', sa.Enum('OPEN', 'IN_PROGRESS', 'COMPLETED', 'OVERDUE', name='taskstatus', native_enum=False), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('assignee_id', sa.Integer(), nullable=True),
+    sa.Column('created_by_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('is_inbox', sa.Boolean(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_tasks_assignee_id'), 'archived_tasks', ['assignee_id'], unique=False)
+    op.create_index(op.f('ix_archived_tasks_created_by_id'), 'archived_tasks', ['created_by_id'], unique=False)
+    op.create_index(op.f('ix_archived_tasks_project_id'), 'archived_tasks', ['project_id'], unique=False)
+    op.create_table('archived_ai_messages',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('conversation_id', sa.Integer(), nullable=True),
+    sa.Column('role', sa.String(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['conversation_id'], ['archived_ai_conversations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_ai_messages_conversation_id'), 'archived_ai_messages', ['conversation_id'], unique=False)
+    op.create_table('archived_task_tags',
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ),
+    sa.ForeignKeyConstraint(['task_id'], ['archived_tasks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('task_id', 'tag_id')
+    )
+    op.create_table('archived_ai_task_suggestions',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('message_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('priority', sa.Enum('HIGH', 'MEDIUM', 'LOW', name='priority', native_enum=False), nullable=True),
+    sa.Column('estimated_duration', sa.String(), nullable=True),
+    sa.Column('project_name', sa.String(), nullable=True),
+    sa.Column('created_task_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['message_id'], ['archived_ai_messages.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_ai_task_suggestions_message_id'), 'archived_ai_task_suggestions', ['message_id'], unique=False)
+    op.create_index('ix_ai_messages_conversation_id_created_at', 'ai_messages', ['conversation_id', 'created_at'], unique=False)
+    op.create_index('ix_tasks_status_completed_at', 'tasks', ['status', 'completed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_status_completed_at', table_name='tasks')
+    op.drop_index('ix_ai_messages_conversation_id_created_at', table_name='ai_messages')
+    op.drop_index(op.f('ix_archived_ai_task_suggestions_message_id'), table_name='archived_ai_task_suggestions')
+    op.drop_table('archived_ai_task_suggestions')
+    op.drop_table('archived_task_tags')
+    op.drop_index(op.f('ix_archived_ai_messages_conversation_id'), table_name='archived_ai_messages')
+    op.drop_table('archived_ai_messages')
+    op.drop_index(op.f('ix_archived_tasks_project_id'), table_name='archived_tasks')
+    op.drop_index(op.f('ix_archived_tasks_created_by_id'), table_name='archived_tasks')
+    op.drop_index(op.f('ix_archived_tasks_assignee_id'), table_name='archived_tasks')
+    op.drop_table('archived_tasks')
+    op.drop_index(op.f('ix_archived_ai_conversations_user_id'), table_name='archived_ai_conversations')
+    op.drop_table('archived_ai_conversations')
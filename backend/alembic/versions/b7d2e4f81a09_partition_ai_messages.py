@@ -0,0 +1,152 @@
+"""Partition AI messages and suggestions by month
+
+Revision ID: b7d2e4f81a09
+Revises: a6f1c9d3e852
+Create Date: 2026-10-20 00:30:00.000000
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4f81a09'
+down_revision: Union[str, None] = 'a6f1c9d3e852'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows copied per INSERT ... SELECT
+BATCH_SIZE = 10000
+
+# Months created past the current one; scripts/maintain_partitions.py keeps this up
+MONTHS_AHEAD = 3
+
+UTC_NOW = "(now() at time zone 'utc')"
+
+AI_MESSAGES_COLUMNS = """
+    id integer NOT NULL DEFAULT nextval('ai_messages_id_seq'),
+    conversation_id integer REFERENCES ai_conversations (id),
+    role varchar,
+    content text,
+    created_at timestamp without time zone NOT NULL
+"""
+
+AI_TASK_SUGGESTIONS_COLUMNS = """
+    id integer NOT NULL DEFAULT nextval('ai_task_suggestions_id_seq'),
+    message_id integer,
+    title varchar,
+    description text,
+    priority priority,
+    estimated_duration varchar,
+    project_name varchar,
+    created_task_id integer REFERENCES tasks (id),
+    created_at timestamp without time zone NOT NULL
+"""
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def column_names(columns: str) -> list:
+    return [line.split()[0] for line in columns.strip().splitlines()]
+
+
+def copy_in_batches(source: str, target: str, columns: list) -> None:
+    names = ", ".join(columns)
+    values = ", ".join(
+        f"coalesce(created_at, {UTC_NOW})" if name == "created_at" else name for name in columns
+    )
+    max_id = op.get_bind().execute(sa.text(f"SELECT coalesce(max(id), 0) FROM {source}")).scalar()
+    for start in range(0, max_id, BATCH_SIZE):
+        op.execute(
+            f"INSERT INTO {target} ({names}) SELECT {values} FROM {source} "
+            f"WHERE id > {start} AND id <= {start + BATCH_SIZE}"
+        )
+
+
+def partition_table(table: str, columns: str) -> None:
+    """Rebuild a table as monthly range partitions on created_at, keeping its rows and id sequence"""
+    old = f"{table}_unpartitioned"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute(f"CREATE TABLE {table} ({columns}) PARTITION BY RANGE (created_at)")
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    
+    # One partition per month from the oldest row to a few months ahead
+    this_month = datetime.utcnow().date().replace(day=1)
+    oldest = op.get_bind().execute(sa.text(f"SELECT min(created_at) FROM {old}")).scalar()
+    month = min(oldest.date().replace(day=1), this_month) if oldest else this_month
+    while month <= add_months(this_month, MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE {table}_y{month.year}m{month.month:02d} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        )
+        month = add_months(month, 1)
+    
+    # Load before building indexes, which is faster than maintaining them row by row
+    copy_in_batches(old, table, column_names(columns))
+    op.execute(f"DROP TABLE {old}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)")
+    op.execute(f"CREATE INDEX ix_{table}_id ON {table} (id)")
+
+
+def unpartition_table(table: str, columns: str) -> None:
+    old = f"{table}_partitioned"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute(f"CREATE TABLE {table} ({columns})")
+    copy_in_batches(old, table, column_names(columns))
+    op.execute(f"DROP TABLE {old}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at DROP NOT NULL")
+    op.execute(f"CREATE INDEX ix_{table}_id ON {table} (id)")
+
+
+def upgrade() -> None:
+    op.add_column('ai_task_suggestions', sa.Column('created_at', sa.DateTime(), nullable=True))
+    
+    # Suggestions go in the month of their message
+    op.execute("""
+        UPDATE ai_task_suggestions SET created_at = (
+            SELECT ai_messages.created_at FROM ai_messages
+            WHERE ai_messages.id = ai_task_suggestions.message_id
+        )
+    """)
+    
+    if op.get_bind().dialect.name == 'postgresql':
+        # A partitioned ai_messages can only be referenced by (id, created_at)
+        op.execute("ALTER TABLE ai_task_suggestions DROP CONSTRAINT ai_task_suggestions_message_id_fkey")
+        partition_table('ai_messages', AI_MESSAGES_COLUMNS)
+        partition_table('ai_task_suggestions', AI_TASK_SUGGESTIONS_COLUMNS)
+        op.execute(
+            "CREATE INDEX ix_ai_messages_conversation_id_created_at "
+            "ON ai_messages (conversation_id, created_at)"
+        )
+    
+    op.create_index(op.f('ix_ai_task_suggestions_message_id'), 'ai_task_suggestions', ['message_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_task_suggestions_message_id'), table_name='ai_task_suggestions')
+    
+    if op.get_bind().dialect.name == 'postgresql':
+        unpartition_table('ai_task_suggestions', AI_TASK_SUGGESTIONS_COLUMNS)
+        unpartition_table('ai_messages', AI_MESSAGES_COLUMNS)
+        op.execute(
+            "CREATE INDEX ix_ai_messages_conversation_id_created_at "
+            "ON ai_messages (conversation_id, created_at)"
+        )
+        op.execute(
+            "ALTER TABLE ai_task_suggestions ADD CONSTRAINT ai_task_suggestions_message_id_fkey "
+            "FOREIGN KEY (message_id) REFERENCES ai_messages (id)"
+        )
+    
+    op.drop_column('ai_task_suggestions', 'created_at')
@@ -0,0 +1,162 @@
+"""Add full-text search over tasks
+
+Revision ID: b81f2d6c9e04
+Revises: f5092f7c3407
+Create Date: 2026-10-19 20:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f2d6c9e04'
+down_revision: Union[str, None] = 'f5092f7c3407'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_TAG_NAMES = """
+    SELECT coalesce(group_concat(tags.name, ' '), '') FROM tags
+    JOIN task_tags ON task_tags.tag_id = tags.id
+    WHERE task_tags.task_id = {task_id}
+"""
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        upgrade_postgresql()
+    else:
+        upgrade_sqlite()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS tags_search_vector_update ON tags")
+        op.execute("DROP TRIGGER IF EXISTS task_tags_search_vector_update ON task_tags")
+        op.execute("DROP TRIGGER IF EXISTS tasks_search_vector_update ON tasks")
+        op.execute("DROP FUNCTION IF EXISTS tags_search_vector_trigger()")
+        op.execute("DROP FUNCTION IF EXISTS task_tags_search_vector_trigger()")
+        op.execute("DROP FUNCTION IF EXISTS tasks_search_vector_trigger()")
+        op.execute("DROP FUNCTION IF EXISTS task_search_vector(integer, text, text)")
+        op.drop_index('ix_tasks_search_vector', table_name='tasks')
+        op.drop_column('tasks', 'search_vector')
+    else:
+        for trigger in (
+            'tags_fts_update',
+            'task_tags_fts_delete',
+            'task_tags_fts_insert',
+            'tasks_fts_delete',
+            'tasks_fts_update',
+            'tasks_fts_insert',
+        ):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
+
+
+def upgrade_sqlite() -> None:
+    op.execute("CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, tags, tokenize='porter unicode61')")
+    op.execute("""
+    CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, title, description, tags)
+        VALUES (new.id, new.title, coalesce(new.description, ''), '');
+    END
+    """)
+    op.execute("""
+    CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        UPDATE tasks_fts SET title = new.title, description = coalesce(new.description, '')
+        WHERE rowid = new.id;
+    END
+    """)
+    op.execute("""
+    CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        DELETE FROM tasks_fts WHERE rowid = old.id;
+    END
+    """)
+    op.execute(f"""
+    CREATE TRIGGER task_tags_fts_insert AFTER INSERT ON task_tags BEGIN
+        UPDATE tasks_fts SET tags = ({SQLITE_TAG_NAMES.format(task_id="new.task_id")})
+        WHERE rowid = new.task_id;
+    END
+    """)
+    op.execute(f"""
+    CREATE TRIGGER task_tags_fts_delete AFTER DELETE ON task_tags BEGIN
+        UPDATE tasks_fts SET tags = ({SQLITE_TAG_NAMES.format(task_id="old.task_id")})
+        WHERE rowid = old.task_id;
+    END
+    """)
+    op.execute(f"""
+    CREATE TRIGGER tags_fts_update AFTER UPDATE OF name ON tags BEGIN
+        UPDATE tasks_fts SET tags = ({SQLITE_TAG_NAMES.format(task_id="tasks_fts.rowid")})
+        WHERE rowid IN (SELECT task_id FROM task_tags WHERE tag_id = new.id);
+    END
+    """)
+    # Index existing tasks
+    op.execute(f"""
+    INSERT INTO tasks_fts (rowid, title, description, tags)
+    SELECT tasks.id, tasks.title, coalesce(tasks.description, ''), ({SQLITE_TAG_NAMES.format(task_id="tasks.id")})
+    FROM tasks
+    """)
+
+
+def upgrade_postgresql() -> None:
+    op.add_column('tasks', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute("""
+    CREATE OR REPLACE FUNCTION task_search_vector(p_task_id integer, p_title text, p_description text)
+    RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('english', coalesce(p_title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(p_description, '')), 'B')
+            || setweight(to_tsvector('english', coalesce((
+                SELECT string_agg(tags.name, ' ') FROM tags
+                JOIN task_tags ON task_tags.tag_id = tags.id
+                WHERE task_tags.task_id = p_task_id
+            ), '')), 'C')
+    $$ LANGUAGE sql STABLE
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION tasks_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := task_search_vector(NEW.id, NEW.title, NEW.description);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE TRIGGER tasks_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_trigger()
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION task_tags_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        UPDATE tasks SET search_vector = task_search_vector(id, title, description)
+        WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.task_id ELSE NEW.task_id END;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE TRIGGER task_tags_search_vector_update
+    AFTER INSERT OR DELETE ON task_tags
+    FOR EACH ROW EXECUTE FUNCTION task_tags_search_vector_trigger()
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION tags_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        UPDATE tasks SET search_vector = task_search_vector(id, title, description)
+        WHERE id IN (SELECT task_id FROM task_tags WHERE tag_id = NEW.id);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE TRIGGER tags_search_vector_update
+    AFTER UPDATE OF name ON tags
+    FOR EACH ROW EXECUTE FUNCTION tags_search_vector_trigger()
+    """)
+    # Index existing tasks before building the GIN index in one pass
+    op.execute("UPDATE tasks SET search_vector = task_search_vector(id, title, description)")
+    op.create_index('ix_tasks_search_vector', 'tasks', ['search_vector'], unique=False, postgresql_using='gin')
@@ -0,0 +1,41 @@
+"""Add task list sort and filter indexes
+
+Revision ID: c3a7e1d94f25
+Revises: b81f2d6c9e04
+Create Date: 2026-10-19 21:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a7e1d94f25'
+down_revision: Union[str, None] = 'b81f2d6c9e04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_tasks_assignee_id'), 'tasks', ['assignee_id'], unique=False)
+    op.create_index(op.f('ix_tasks_created_by_id'), 'tasks', ['created_by_id'], unique=False)
+    op.create_index(op.f('ix_task_tags_tag_id'), 'task_tags', ['tag_id'], unique=False)
+    # Expressions must match app.models.task.TASK_SORT_EXPRESSIONS exactly
+    op.create_index('ix_tasks_project_id_due_date', 'tasks', ['project_id', sa.text("coalesce(due_date, '9999-12-31')"), 'id'], unique=False)
+    op.create_index('ix_tasks_project_id_priority', 'tasks', ['project_id', sa.text("(CASE WHEN (priority = 'HIGH') THEN 0 WHEN (priority = 'MEDIUM') THEN 1 WHEN (priority = 'LOW') THEN 2 END)"), 'id'], unique=False)
+    op.create_index('ix_tasks_project_id_status', 'tasks', ['project_id', sa.text("(CASE WHEN (status = 'OPEN') THEN 0 WHEN (status = 'IN_PROGRESS') THEN 1 WHEN (status = 'OVERDUE') THEN 2 WHEN (status = 'COMPLETED') THEN 3 END)"), 'id'], unique=False)
+    op.create_index('ix_tasks_project_id_title', 'tasks', ['project_id', sa.text('lower(title)'), 'id'], unique=False)
+    op.create_index('ix_tasks_project_id_updated_at', 'tasks', ['project_id', 'updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_project_id_updated_at', table_name='tasks')
+    op.drop_index('ix_tasks_project_id_title', table_name='tasks')
+    op.drop_index('ix_tasks_project_id_status', table_name='tasks')
+    op.drop_index('ix_tasks_project_id_priority', table_name='tasks')
+    op.drop_index('ix_tasks_project_id_due_date', table_name='tasks')
+    op.drop_index(op.f('ix_task_tags_tag_id'), table_name='task_tags')
+    op.drop_index(op.f('ix_tasks_created_by_id'), table_name='tasks')
+    op.drop_index(op.f('ix_tasks_assignee_id'), table_name='tasks')
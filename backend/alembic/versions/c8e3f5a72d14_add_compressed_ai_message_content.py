@@ -0,0 +1,71 @@
+"""Add compressed AI message content
+
+Only adds the columns. Existing rows stay readable as plain text and are
+compressed by scripts/compress_messages.py, which works in small batches
+while the app keeps running. Downgrading writes the full text of every
+compressed row back to content before dropping the columns.
+
+Revision ID: c8e3f5a72d14
+Revises: b7d2e4f81a09
+Create Date: 2026-10-20 01:30:00.000000
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e3f5a72d14'
+down_revision: Union[str, None] = 'b7d2e4f81a09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ai_messages', sa.Column('content_codec', sa.String(length=8), nullable=True))
+    op.add_column('ai_messages', sa.Column('content_blob', sa.LargeBinary(), nullable=True))
+    op.add_column('archived_ai_messages', sa.Column('content_codec', sa.String(length=8), nullable=True))
+    op.add_column('archived_ai_messages', sa.Column('content_blob', sa.LargeBinary(), nullable=True))
+
+
+def decompress(blob: bytes, codec: str) -> str:
+    if codec == 'zlib':
+        return zlib.decompress(blob).decode()
+    if codec == 'zstd':
+        import zstandard  # needed only if some rows were stored with zstd
+        return zstandard.ZstdDecompressor().decompress(blob).decode()
+    raise ValueError(f"Unsupported compression codec: {codec}")
+
+
+def restore_plain_content(table: str, batch_size: int = 1000) -> None:
+    """Put the full text of compressed rows back into content"""
+    conn = op.get_bind()
+    after_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                f"SELECT id, content_codec, content_blob FROM {table} "
+                "WHERE content_codec IS NOT NULL AND id > :after_id ORDER BY id LIMIT :limit"
+            ),
+            {"after_id": after_id, "limit": batch_size},
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            sa.text(f"UPDATE {table} SET content = :content WHERE id = :id"),
+            [{"id": row.id, "content": decompress(row.content_blob, row.content_codec)} for row in rows],
+        )
+        after_id = rows[-1].id
+
+
+def downgrade() -> None:
+    # Compressed rows keep only a preview in content; restore them first
+    restore_plain_content('ai_messages')
+    restore_plain_content('archived_ai_messages')
+    op.drop_column('archived_ai_messages', 'content_blob')
+    op.drop_column('archived_ai_messages', 'content_codec')
+    op.drop_column('ai_messages', 'content_blob')
+    op.drop_column('ai_messages', 'content_codec')
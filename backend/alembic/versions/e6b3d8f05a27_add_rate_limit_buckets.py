@@ -0,0 +1,40 @@
+"""Add rate limit buckets
+
+Only used with RATE_LIMIT_BACKEND=postgres. The table is UNLOGGED there:
+losing buckets in a crash just refills them.
+
+Revision ID: e6b3d8f05a27
+Revises: d4f7a2c9e615
+Create Date: 2026-10-20 02:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b3d8f05a27'
+down_revision: Union[str, None] = 'd4f7a2c9e615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('rate_limit_buckets',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('allowed', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_rate_limit_buckets_updated_at'), 'rate_limit_buckets', ['updated_at'], unique=False)
+    
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE rate_limit_buckets SET UNLOGGED")
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_rate_limit_buckets_updated_at'), table_name='rate_limit_buckets')
+    op.drop_table('rate_limit_buckets')
@@ -0,0 +1,51 @@
+"""Add task change tracking for delta sync
+
+Revision ID: f5092f7c3407
+Revises: 948ed85cd249
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5092f7c3407'
+down_revision: Union[str, None] = '948ed85cd249'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    change_sequence = op.create_table('change_sequence',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(change_sequence, [{'id': 1, 'value': 0}])
+    op.create_table('task_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_tombstones_id'), 'task_tombstones', ['id'], unique=False)
+    op.create_index('ix_task_tombstones_user_id_change_seq', 'task_tombstones', ['user_id', 'change_seq'], unique=False)
+    # Existing tasks start at 0 and are picked up by a client's first full sync
+    op.add_column('tasks', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_tasks_change_seq'), 'tasks', ['change_seq'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tasks_change_seq'), table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('change_seq')
+    op.drop_index('ix_task_tombstones_user_id_change_seq', table_name='task_tombstones')
+    op.drop_index(op.f('ix_task_tombstones_id'), table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_table('change_sequence')
@@ -1,21 +1,85 @@
-from typing import Generator, Optional
+from typing import Generator, Optional, Sequence, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
 from app.database import get_db
 from app.config import settings
 from app.models.user import User
+from app.core.cache import cache, invalidate
+from app.core.write_behind import write_behind
+from app.core.revocation import revocations
 
 security = HTTPBearer()
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
-    token = credentials.credentials
+# Column values of recently seen users, keyed by id
+user_cache = cache("user", ttl=settings.USER_CACHE_TTL_SECONDS)
+
+# Buffered users.last_login updates; cached rows are refreshed once written
+user_writes = write_behind(
+    User.__table__,
+    on_flush=lambda user_ids: invalidate(*(user_cache.key(user_id) for user_id in user_ids))
+)
+
+
+def load_user(db: Session, user_id: int) -> Optional[User]:
+    """Load a user, serving the row from the user cache when possible
+    
+    Cached rows are attached to the session without a SELECT, so routers
+    can read, modify and commit them like any other loaded user.
+    """
+    def load_columns():
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            return None
+        return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+    
+    values = user_cache.get_or_load(user_id, load_columns)
+    if values is None:
+        return None
+    
+    user = db.identity_map.get(identity_key(User, user_id))
+    if user is None:
+        user = User(**values)
+        make_transient_to_detached(user)
+        db.add(user)
+    return user
+
+
+# User columns carried in access tokens when STATELESS_AUTH is on
+TOKEN_CLAIMS = ("email", "name", "role")
+
+
+def token_claims(user: User) -> dict:
+    """Claims for a new access token of ``user``"""
+    claims = {"sub": str(user.id)}
+    if settings.STATELESS_AUTH:
+        claims.update({claim: getattr(user, claim) for claim in TOKEN_CLAIMS})
+    return claims
+
+
+def user_from_claims(db: Session, user_id: int, payload: dict) -> User:
+    """The token's user, built from its claims without a query
     
+    Columns not in the token are loaded from the database on first access.
+    """
+    user = db.identity_map.get(identity_key(User, user_id))
+    if user is None:
+        user = User(id=user_id, is_active=True, **{claim: payload[claim] for claim in TOKEN_CLAIMS})
+        make_transient_to_detached(user)
+        db.add(user)
+    return user
+
+
+def get_user_from_token(db: Session, token: str, stateless: bool = True) -> User:
+    """The user a bearer token belongs to
+    
+    With STATELESS_AUTH, tokens carrying claims are accepted without a
+    database lookup unless the revocation filter flags their user.
+    ``stateless=False`` always checks the database.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -26,13 +90,21 @@ def get_current_user(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
             )
-    except JWTError:
+        user_id = int(user_id)
+    except (JWTError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    if (
+        stateless and settings.STATELESS_AUTH
+        and all(claim in payload for claim in TOKEN_CLAIMS)
+        and not revocations.might_be_revoked(user_id)
+    ):
+        return user_from_claims(db, user_id, payload)
+    
+    user = load_user(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -48,9 +120,66 @@ def get_current_user(
     return user
 
 
+def get_current_user(
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    return get_user_from_token(db, credentials.credentials)
+
+
+def get_current_db_user(
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    """Like get_current_user, but always confirmed against the database
+    
+    Use for endpoints that show or change the user's own account.
+    """
+    return get_user_from_token(db, credentials.credentials, stateless=False)
+
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Tuple[str, ...]:
+    """Parse a sparse fieldset such as "id,title,status".
+    
+    Returns the requested fields in the order of ``allowed`` (always
+    including ``id``), or all fields when none are requested.
+    """
+    if not fields:
+        return tuple(allowed)
+    
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    
+    requested.add("id")
+    return tuple(field for field in allowed if field in requested)
+
+
+def parse_sort(sort: Optional[str], allowed: Sequence[str]) -> Tuple[Optional[str], bool]:
+    """Parse a sort parameter such as "due_date" or "-priority".
+    
+    Returns the sort key (None when unsorted) and whether it is descending.
+    """
+    if not sort:
+        return None, False
+    
+    descending = sort.startswith("-")
+    key = sort[1:] if descending else sort
+    if key not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sort key: {key}. Use one of {', '.join(allowed)}"
+        )
+    return key, descending
@@ -1,22 +1,36 @@
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.orm import Session, selectinload, undefer
 from pydantic import BaseModel
-import openai
-from anthropic import Anthropic
 from app.database import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.models.settings import UserSettings
 from app.models.ai_chat import AIConversation, AIMessage, AITaskSuggestion
 from app.models.task import Task
 from app.models.project import Project
 from app.models.enums import Priority
-from app.api.v1.settings import decrypt_api_key
+from app.api.v1.settings import AIClientSettings, load_ai_client_settings
+from app.crud.changes import next_change_seq
+from app.crud.dashboard import invalidate_dashboards
+from app.crud.conversations import (
+    CONVERSATION_SUMMARY_CACHE,
+    conversation_summaries,
+    invalidate_conversation_summaries,
+)
+from app.core.cache import cached
+from app.core.events import hub
+from app.core.ratelimit import RateLimiter, limit_by_user
+from app.config import settings
 
 router = APIRouter()
 
+# Messages never predate their conversation, so history queries are bounded
+# by its start (less some clock skew between workers) and Postgres only
+# scans the ai_messages partitions from that month on
+HISTORY_CLOCK_SLACK = timedelta(days=1)
+
 
 # Pydantic schemas
 class ChatMessage(BaseModel):
@@ -67,7 +81,16 @@ class ConversationResponse(BaseModel):
         from_attributes = True
 
 
-def get_ai_client(user_settings: UserSettings):
+class ConversationSummary(BaseModel):
+    id: int
+    title: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    message_count: int
+    last_message: Optional[str]
+
+
+def get_ai_client(user_settings: AIClientSettings):
     """Get AI client based on user preferences"""
     if not user_settings.enable_ai_features:
         raise HTTPException(
@@ -75,34 +98,34 @@ def get_ai_client(user_settings: UserSettings):
             detail="AI features are disabled in settings"
         )
     
-    if user_settings.preferred_ai_provider == "openai":
-        api_key = decrypt_api_key(user_settings.openai_api_key_encrypted)
-        if not api_key:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="OpenAI API key not configured"
-            )
-        return openai.Client(api_key=api_key)
-    else:
-        api_key = decrypt_api_key(user_settings.anthropic_api_key_encrypted)
-        if not api_key:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Anthropic API key not configured"
-            )
-        return Anthropic(api_key=api_key)
+    if user_settings.client is None:
+        provider = "OpenAI" if user_settings.preferred_ai_provider == "openai" else "Anthropic"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{provider} API key not configured"
+        )
+    return user_settings.client
 
 
-@router.post("/chat", response_model=MessageResponse)
+# Keeps one user from saturating the AI provider
+chat_limiter = RateLimiter("ai_chat", settings.RATE_LIMIT_CHAT_PER_MINUTE, settings.RATE_LIMIT_CHAT_BURST)
+
+
+@router.post(
+    "/chat",
+    response_model=MessageResponse,
+    dependencies=[Depends(limit_by_user(chat_limiter, get_current_user))]
+)
 async def send_chat_message(
     message: ChatMessage,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    # Commits below expire current_user; keep its id for after them
+    user_id = current_user.id
+    
     # Get user settings
-    user_settings = db.query(UserSettings).filter(
-        UserSettings.user_id == current_user.id
-    ).first()
+    user_settings = load_ai_client_settings(db, user_id)
     
     if not user_settings:
         raise HTTPException(
@@ -145,8 +168,9 @@ async def send_chat_message(
         
         # Prepare conversation history
         messages = db.query(AIMessage).filter(
-            AIMessage.conversation_id == conversation.id
-        ).order_by(AIMessage.created_at).all()
+            AIMessage.conversation_id == conversation.id,
+            AIMessage.created_at >= conversation.created_at - HISTORY_CLOCK_SLACK
+        ).options(undefer(AIMessage.content_blob)).order_by(AIMessage.created_at).all()
         
         conversation_history = [
             {"role": msg.role, "content": msg.content}
@@ -177,6 +201,7 @@ async def send_chat_message(
         )
         db.add(ai_message)
         db.commit()
+        invalidate_conversation_summaries([user_id])
         db.refresh(ai_message)
         
         # Parse for task suggestions (simplified - in production, use proper NLP)
@@ -187,7 +212,7 @@ async def send_chat_message(
         return MessageResponse(
             id=ai_message.id,
             role=ai_message.role,
-            content=ai_message.content,
+            content=ai_response_content,
             created_at=ai_message.created_at,
             task_suggestions=task_suggestions
         )
@@ -201,6 +226,7 @@ async def send_chat_message(
         )
         db.add(error_message)
         db.commit()
+        invalidate_conversation_summaries([user_id])
         db.refresh(error_message)
         
         return MessageResponse(
@@ -219,11 +245,34 @@ def get_conversations(
 ):
     conversations = db.query(AIConversation).filter(
         AIConversation.user_id == current_user.id
+    ).options(
+        selectinload(AIConversation.messages).options(
+            undefer(AIMessage.content_blob),
+            selectinload(AIMessage.task_suggestions)
+        )
     ).order_by(AIConversation.updated_at.desc()).all()
     
     return conversations
 
 
+@cached(
+    CONVERSATION_SUMMARY_CACHE,
+    ttl=settings.CONVERSATION_SUMMARY_CACHE_TTL_SECONDS,
+    key=lambda db, user_id: user_id
+)
+def load_conversation_summaries(db: Session, user_id: int) -> bytes:
+    return ORJSONResponse(conversation_summaries(db, user_id)).body
+
+
+@router.get("/conversations/summaries", response_model=List[ConversationSummary])
+def get_conversation_summaries(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Conversation list without message bodies, newest first"""
+    return Response(load_conversation_summaries(db, current_user.id), media_type="application/json")
+
+
 @router.post("/suggestions/{suggestion_id}/create-task", response_model=dict)
 def create_task_from_suggestion(
     suggestion_id: int,
@@ -263,7 +312,8 @@ def create_task_from_suggestion(
         priority=suggestion.priority,
         created_by_id=current_user.id,
         assignee_id=current_user.id,
-        is_inbox=True  # Default to inbox
+        is_inbox=True,  # Default to inbox
+        change_seq=next_change_seq(db)
     )
     
     db.add(task)
@@ -274,6 +324,15 @@ def create_task_from_suggestion(
     suggestion.created_task_id = task.id
     db.commit()
     
+    invalidate_dashboards([current_user.id])
+    hub.publish(
+        "task.created",
+        [current_user.id],
+        task_ids=[task.id],
+        project_id=None,
+        cursor=task.change_seq
+    )
+    
     return {
         "message": "Task created successfully",
         "task_id": task.id
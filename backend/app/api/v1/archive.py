@@ -0,0 +1,118 @@
+from typing import List, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from app.database import get_db
+from app.api.deps import get_current_user
+from app.api.v1.tasks import TaskResponse
+from app.api.v1.ai_chat import MessageResponse
+from app.models.user import User
+from app.models.archive import ArchivedConversation, ArchivedTask
+from app.crud.access import accessible_project_ids
+from app.crud.archive import (
+    ARCHIVED_TASK_FIELDS,
+    archived_conversation,
+    archived_messages,
+    archived_task_query,
+    archived_tasks_filter,
+)
+from app.crud.tasks import fetch_task_dicts
+
+router = APIRouter()
+
+
+# Pydantic schemas
+class ArchivedTaskResponse(TaskResponse):
+    archived_at: datetime
+
+
+class ArchivedConversationSummary(BaseModel):
+    id: int
+    title: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    archived_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class ArchivedConversationResponse(ArchivedConversationSummary):
+    messages: List[MessageResponse]
+
+
+@router.get("/tasks", response_model=List[ArchivedTaskResponse])
+def get_archived_tasks(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[int] = Query(None, description="X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Archived tasks the user can see, most recently created first"""
+    criteria = [archived_tasks_filter(current_user.id, accessible_project_ids(db, current_user.id))]
+    if cursor is not None:
+        criteria.append(ArchivedTask.id < cursor)
+    
+    tasks = fetch_task_dicts(db, archived_task_query(db, *criteria).limit(limit), ARCHIVED_TASK_FIELDS)
+    headers = {}
+    if len(tasks) == limit:
+        headers["X-Next-Cursor"] = str(tasks[-1]["id"])
+    return ORJSONResponse(tasks, headers=headers)
+
+
+@router.get("/tasks/{task_id}", response_model=ArchivedTaskResponse)
+def get_archived_task(
+    task_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    tasks = fetch_task_dicts(
+        db,
+        archived_task_query(
+            db,
+            ArchivedTask.id == task_id,
+            archived_tasks_filter(current_user.id, accessible_project_ids(db, current_user.id))
+        ),
+        ARCHIVED_TASK_FIELDS
+    )
+    if not tasks:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archived task not found"
+        )
+    return ORJSONResponse(tasks[0])
+
+
+@router.get("/conversations", response_model=List[ArchivedConversationSummary])
+def get_archived_conversations(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return db.query(ArchivedConversation).filter(
+        ArchivedConversation.user_id == current_user.id
+    ).order_by(ArchivedConversation.updated_at.desc()).all()
+
+
+@router.get("/conversations/{conversation_id}", response_model=ArchivedConversationResponse)
+def get_archived_conversation(
+    conversation_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    conversation = archived_conversation(db, current_user.id, conversation_id)
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archived conversation not found"
+        )
+    
+    return ArchivedConversationResponse(
+        id=conversation.id,
+        title=conversation.title,
+        created_at=conversation.created_at,
+        updated_at=conversation.updated_at,
+        archived_at=conversation.archived_at,
+        messages=archived_messages(db, conversation.id)
+    )
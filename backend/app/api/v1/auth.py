@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from jose import jwt
@@ -10,6 +10,12 @@ from app.database import get_db
 from app.config import settings
 from app.models.user import User
 from app.models.settings import UserSettings
+from app.api.deps import load_user, token_claims, user_writes
+from app.models.refresh_token import RefreshToken
+from app.core.ratelimit import RateLimiter, client_ip
+from app.crud.refresh_tokens import (
+    hash_refresh_token, new_refresh_token, revoke_refresh_tokens, rotate_refresh_token, store_refresh_token
+)
 
 router = APIRouter()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -31,6 +37,11 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class UserResponse(BaseModel):
@@ -93,8 +104,16 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 
-@router.post("/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+# Checked before the password, so guessing costs no bcrypt work once limited
+login_limiter = RateLimiter("login", settings.RATE_LIMIT_LOGIN_PER_MINUTE, settings.RATE_LIMIT_LOGIN_BURST)
+
+
+def limit_login(request: Request, user_credentials: UserLogin):
+    login_limiter.check(("ip", client_ip(request)), ("email", user_credentials.email.lower()))
+
+
+@router.post("/login", response_model=Token, dependencies=[Depends(limit_login)])
+def login(user_credentials: UserLogin, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == user_credentials.email).first()
     
     if not user or not verify_password(user_credentials.password, user.hashed_password):
@@ -104,14 +123,63 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login (written in the background, see user_writes)
+    user_writes.set(user.id, last_login=datetime.utcnow())
     
-    # Create access token
+    # Create access token, and a refresh token to renew it without the password
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+        data=token_claims(user), expires_delta=access_token_expires
     )
+    refresh_token = new_refresh_token()
+    
+    # Stored after the response is sent, so a login commits nothing on the
+    # request path. A refresh is minutes away; should the insert be lost,
+    # that refresh fails and the client signs in again.
+    background_tasks.add_task(store_refresh_token, refresh_token, user.id)
+    
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(request: RefreshRequest, db: Session = Depends(get_db)):
+    """Trade a refresh token for a new access token and refresh token"""
+    rotated = rotate_refresh_token(db, request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_id, refresh_token = rotated
+    
+    # Only the claims come from here; rotation checked is_active
+    user = load_user(db, user_id)
+    if user is None or not user.is_active:
+        revoke_refresh_tokens(db, user_id=user_id)
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data=token_claims(user), expires_delta=access_token_expires
+    )
+    
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post("/logout")
+def logout(request: RefreshRequest, db: Session = Depends(get_db)):
+    """Revoke the refresh token's session"""
+    row = db.query(RefreshToken.family).filter(
+        RefreshToken.token_hash == hash_refresh_token(request.refresh_token)
+    ).first()
+    if row:
+        revoke_refresh_tokens(db, family=row.family)
+        db.commit()
     
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"message": "Logged out"}
\ No newline at end of file
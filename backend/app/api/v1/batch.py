@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Literal, Optional
+from urllib.parse import unquote, urlsplit
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, field_validator
+from starlette.types import ASGIApp, Message
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Streams and nested batches cannot be answered inside a batch
+EXCLUDED_PREFIXES = ("/api/v1/batch", "/api/v1/events", "/api/v1/export")
+
+
+# Pydantic schemas
+class BatchItem(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    url: str = Field(..., description="Path and query string, e.g. /api/v1/tasks/?project_id=3")
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+    
+    @field_validator("headers")
+    @classmethod
+    def headers_are_latin1(cls, headers: Dict[str, str]) -> Dict[str, str]:
+        # HTTP header names and values are bytes; ASGI carries them as latin-1
+        for name, value in headers.items():
+            try:
+                name.encode("latin-1")
+                value.encode("latin-1")
+            except UnicodeEncodeError:
+                raise ValueError(f"Header {name!r} is not latin-1 text")
+        return headers
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+
+class BatchResult(BaseModel):
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any]
+
+
+def validate_item(item: BatchItem) -> None:
+    # Routes match the decoded path, so check that one
+    path = unquote(urlsplit(item.url).path)
+    if not path.startswith("/api/v1/") or path.startswith(EXCLUDED_PREFIXES):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot batch {item.method} {item.url}"
+        )
+
+
+async def call_app(app: ASGIApp, request: Request, item: BatchItem) -> dict:
+    """Run one sub-request through the app in this process
+    
+    The sub-request carries the batch's Authorization header and client
+    address, so it sees the same user and the same rate limits.
+    """
+    url = urlsplit(item.url)
+    body = b"" if item.body is None else orjson.dumps(item.body)
+    headers = [(name, value) for name, value in request.scope["headers"] if name == b"authorization"]
+    headers += [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in item.headers.items() if name.lower() not in ("authorization", "content-length")
+    ]
+    if item.body is not None:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": item.method,
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": unquote(url.path),
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "state": dict(request.scope.get("state", {})),
+    }
+    
+    body_sent = False
+    finished = asyncio.Event()
+    response = {"status": None, "headers": [], "body": []}
+    
+    async def receive() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+    
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+    
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # The app has already sent its 500 response when it re-raises
+        logger.exception("Batched %s %s failed", item.method, url.path)
+    finally:
+        finished.set()
+    
+    if response["status"] is None:
+        return {"status": 500, "headers": {}, "body": {"detail": "Internal Server Error"}}
+    
+    headers = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in response["headers"] if name != b"content-length"
+    }
+    content = b"".join(response["body"])
+    if not content:
+        result = None
+    elif headers.get("content-type", "").startswith("application/json"):
+        result = orjson.loads(content)
+    else:
+        result = content.decode("utf-8", "replace")
+    return {"status": response["status"], "headers": headers, "body": result}
+
+
+@router.post("", response_model=List[BatchResult])
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """Run several API requests in one round trip
+    
+    Sub-requests go through the app in this process as the caller and
+    results come back in request order, each with its own status. GETs
+    between two writes run concurrently; writes run one at a time in
+    order, after every request listed before them.
+    """
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_REQUESTS} requests per batch"
+        )
+    for item in batch.requests:
+        validate_item(item)
+    
+    app = request.app
+    results: List[Optional[dict]] = [None] * len(batch.requests)
+    semaphore = asyncio.Semaphore(settings.BATCH_READ_CONCURRENCY)
+    
+    async def read(index: int) -> None:
+        async with semaphore:
+            results[index] = await call_app(app, request, batch.requests[index])
+    
+    reads: List[int] = []
+    for index, item in enumerate(batch.requests):
+        if item.method == "GET":
+            reads.append(index)
+            continue
+        await asyncio.gather(*(read(i) for i in reads))
+        reads = []
+        results[index] = await call_app(app, request, item)
+    await asyncio.gather(*(read(i) for i in reads))
+    
+    return ORJSONResponse(results)
@@ -0,0 +1,47 @@
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from app.database import get_db
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.crud.access import accessible_project_ids
+from app.crud.dashboard import cached_dashboard_summary, dashboard_summary
+from app.crud.tasks import mark_overdue_tasks, visible_tasks_filter
+
+router = APIRouter()
+
+
+# Pydantic schemas
+class ProjectTaskCounts(BaseModel):
+    project_id: Optional[int]
+    project_name: Optional[str]
+    total_tasks: int
+    completed_tasks: int
+
+
+class DashboardSummary(BaseModel):
+    total_tasks: int
+    due_today: int
+    overdue: int
+    total_projects: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_project: List[ProjectTaskCounts]
+
+
+@router.get("/summary", response_model=DashboardSummary)
+def get_dashboard_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    project_ids = accessible_project_ids(db, current_user.id)
+    visible = visible_tasks_filter(current_user.id, project_ids)
+    
+    # Update overdue tasks so the status counts match the task list
+    summary = cached_dashboard_summary(
+        current_user.id,
+        lambda: dashboard_summary(db, visible),
+        lambda: mark_overdue_tasks(db, visible)
+    )
+    return {**summary, "total_projects": len(project_ids)}
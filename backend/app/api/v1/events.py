@@ -0,0 +1,57 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from app.database import SessionLocal
+from app.api.deps import get_user_from_token
+from app.core.events import hub
+
+router = APIRouter()
+
+
+def authenticate(token: str) -> int:
+    db = SessionLocal()
+    try:
+        return get_user_from_token(db, token).id
+    finally:
+        db.close()
+
+
+async def wait_for_disconnect(websocket: WebSocket):
+    # Clients don't send anything; reading just notices when they leave
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/ws")
+async def event_stream(websocket: WebSocket, token: str = Query(...)):
+    """Push task and project change events to the connected user
+    
+    Events carry ids only (and the delta sync cursor for task events);
+    clients fetch the data through the regular endpoints. A {"type":
+    "resync"} event means events were dropped and the client should sync.
+    """
+    try:
+        user_id = await run_in_threadpool(authenticate, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    subscriber = hub.connect(user_id)
+    disconnected = asyncio.create_task(wait_for_disconnect(websocket))
+    try:
+        while True:
+            next_event = asyncio.create_task(subscriber.queue.get())
+            await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                next_event.cancel()
+                break
+            await websocket.send_json(next_event.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        hub.disconnect(subscriber)
@@ -0,0 +1,100 @@
+from typing import Iterator, Optional
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.api.deps import get_current_user, parse_fields
+from app.models.user import User
+from app.models.ai_chat import AIConversation, AIMessage
+from app.crud.access import accessible_project_ids
+from app.crud.tasks import TASK_FIELDS, order_task_query, stream_task_dicts, task_list_query, visible_tasks_filter
+from app.core.compression import unpack_text
+from app.core.export import export_response
+
+router = APIRouter()
+
+# Rows fetched per round trip while streaming
+EXPORT_BATCH_SIZE = 1000
+
+CONVERSATION_EXPORT_FIELDS = (
+    "conversation_id",
+    "conversation_title",
+    "message_id",
+    "role",
+    "content",
+    "created_at",
+)
+
+FORMAT_PATTERN = "^(ndjson|csv)$"
+
+
+def export_task_rows(user_id: int, fields) -> Iterator[dict]:
+    # The response outlives the request, so the stream uses its own session
+    db = SessionLocal()
+    try:
+        visible = visible_tasks_filter(user_id, accessible_project_ids(db, user_id))
+        query = order_task_query(task_list_query(db, visible, fields=fields), None, False)
+        yield from stream_task_dicts(db, query, fields, EXPORT_BATCH_SIZE)
+    finally:
+        db.close()
+
+
+def export_conversation_rows(user_id: int) -> Iterator[dict]:
+    db = SessionLocal()
+    try:
+        query = select(
+            AIConversation.id,
+            AIConversation.title,
+            AIMessage.id,
+            AIMessage.role,
+            AIMessage.created_at,
+            AIMessage.preview,
+            AIMessage.content_codec,
+            AIMessage.content_blob,
+        ).join(
+            AIMessage, AIMessage.conversation_id == AIConversation.id
+        ).where(
+            AIConversation.user_id == user_id
+        ).order_by(AIConversation.id, AIMessage.id)
+        
+        result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for conversation_id, title, message_id, role, created_at, *content in result:
+            yield {
+                "conversation_id": conversation_id,
+                "conversation_title": title,
+                "message_id": message_id,
+                "role": role,
+                "content": unpack_text(*content),
+                "created_at": created_at,
+            }
+    finally:
+        db.close()
+
+
+@router.get("/tasks")
+def export_tasks(
+    request: Request,
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    fields: Optional[str] = Query(None, description="Comma separated subset of task fields"),
+    current_user: User = Depends(get_current_user)
+):
+    """Download every task the user can see as NDJSON or CSV"""
+    fields = parse_fields(fields, TASK_FIELDS)
+    return export_response(
+        request, export_task_rows(current_user.id, fields), fields, format, "tasks"
+    )
+
+
+@router.get("/conversations")
+def export_conversations(
+    request: Request,
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    current_user: User = Depends(get_current_user)
+):
+    """Download the user's AI conversations, one row per message"""
+    return export_response(
+        request,
+        export_conversation_rows(current_user.id),
+        CONVERSATION_EXPORT_FIELDS,
+        format,
+        "conversations"
+    )
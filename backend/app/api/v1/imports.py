@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+from typing import List, Optional
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from app.database import get_db
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.models.imports import ImportJob
+from app.crud.imports import IMPORT_FORMATS, run_task_import
+
+router = APIRouter()
+
+FILE_EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+
+# Pydantic schemas
+class ImportRowError(BaseModel):
+    row: Optional[int]
+    error: str
+
+
+class ImportJobResponse(BaseModel):
+    id: int
+    status: str
+    filename: Optional[str]
+    format: str
+    progress: int
+    processed_rows: int
+    created_count: int
+    error_count: int
+    errors: List[ImportRowError]
+    created_at: datetime
+    finished_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
+def job_response(job: ImportJob) -> ImportJobResponse:
+    job.progress = int(job.processed_bytes * 100 / job.total_bytes) if job.total_bytes else 0
+    if job.status == "completed":
+        job.progress = 100
+    return ImportJobResponse.model_validate(job)
+
+
+@router.post("/tasks", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def import_tasks(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON"),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults to the file extension"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Start importing tasks; poll GET /imports/{id} for progress and row errors
+    
+    Columns: title (required), description, priority, status, due_date,
+    project_id or project_name, assignee_id or assignee_email, and tags
+    (a list, or comma separated in CSV). Other columns are ignored, so an
+    export can be imported as is.
+    """
+    format = format or FILE_EXTENSIONS.get(os.path.splitext(file.filename or "")[1].lower())
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass format=csv or format=ndjson"
+        )
+    
+    # Copy the upload in chunks to a file the background job owns, since
+    # the upload itself is closed once this request finishes
+    with tempfile.NamedTemporaryFile(prefix="task-import-", delete=False) as copy:
+        try:
+            shutil.copyfileobj(file.file, copy)
+            total_bytes = copy.tell()
+        except Exception:
+            os.remove(copy.name)
+            raise
+    
+    try:
+        job = ImportJob(
+            user_id=current_user.id,
+            filename=file.filename,
+            format=format,
+            total_bytes=total_bytes
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+    except Exception:
+        # Without a job nothing would ever read or remove the copy
+        os.remove(copy.name)
+        raise
+    
+    background_tasks.add_task(run_task_import, job.id, copy.name)
+    return job_response(job)
+
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+def get_import_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    job = db.query(ImportJob).filter(
+        ImportJob.id == job_id,
+        ImportJob.user_id == current_user.id
+    ).first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    
+    return job_response(job)
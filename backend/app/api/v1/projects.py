@@ -1,14 +1,32 @@
 from typing import List, Optional
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, date
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import ORJSONResponse, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, parse_fields
 from app.models.user import User
 from app.models.project import Project, ProjectMember
 from app.models.task import Task
 from app.models.enums import ProjectStatus, TaskStatus
+from app.crud.access import accessible_project_ids, invalidate_access, require_project_access
+from app.crud.changes import touch_tasks
+from app.crud.dashboard import invalidate_dashboards
+from app.crud.projects import (
+    PROJECT_FIELDS,
+    PROJECT_LIST_CACHE,
+    fetch_project_dicts,
+    invalidate_project_lists,
+    project_audience,
+    project_list_query,
+    project_list_version,
+    visible_projects_filter,
+)
+from app.core.cache import cached
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.events import hub
+from app.config import settings
 
 router = APIRouter()
 
@@ -34,7 +52,7 @@ class ProjectResponse(BaseModel):
     description: Optional[str]
     status: ProjectStatus
     progress: int
-    due_date: Optional[str]
+    due_date: Optional[date]
     owner_id: int
     total_tasks: int
     completed_tasks: int
@@ -45,33 +63,43 @@ class ProjectResponse(BaseModel):
         from_attributes = True
 
 
+@cached(
+    PROJECT_LIST_CACHE,
+    ttl=settings.PROJECT_LIST_CACHE_TTL_SECONDS,
+    key=lambda db, user_id, fields, etag: (user_id, fields, etag)
+)
+def load_project_list(db: Session, user_id: int, fields, etag: str) -> bytes:
+    """JSON body of a user's project list at the version ``etag`` names
+    
+    The version is part of the key, so a write never leaves a stale body
+    behind, even in workers that missed its invalidation.
+    """
+    criteria = [visible_projects_filter(accessible_project_ids(db, user_id))]
+    query = project_list_query(*criteria, fields=fields)
+    return ORJSONResponse(fetch_project_dicts(db, query, fields)).body
+
+
 @router.get("/", response_model=List[ProjectResponse])
 def get_projects(
+    request: Request,
+    fields: Optional[str] = Query(
+        None, description="Comma separated subset of fields to return, e.g. id,name,progress"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Get projects where user is owner or member
-    owned_projects = db.query(Project).filter(Project.owner_id == current_user.id).all()
-    member_projects = db.query(Project).join(ProjectMember).filter(
-        ProjectMember.user_id == current_user.id
-    ).all()
-    
-    # Combine and remove duplicates
-    all_projects = list({p.id: p for p in owned_projects + member_projects}.values())
-    
-    # Calculate progress for each project
-    for project in all_projects:
-        total_tasks = db.query(Task).filter(Task.project_id == project.id).count()
-        completed_tasks = db.query(Task).filter(
-            Task.project_id == project.id,
-            Task.status == TaskStatus.COMPLETED
-        ).count()
-        
-        project.total_tasks = total_tasks
-        project.completed_tasks = completed_tasks
-        project.progress = int((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0)
-    
-    return all_projects
+    fields = parse_fields(fields, PROJECT_FIELDS)
+    
+    criteria = [visible_projects_filter(accessible_project_ids(db, current_user.id))]
+    
+    # Answer conditional requests before loading any rows
+    etag = make_etag(current_user.id, request.url.query, *project_list_version(db, *criteria))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Get projects where user is owner or member, with task counts if needed
+    body = load_project_list(db, current_user.id, fields, etag)
+    return Response(body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.post("/", response_model=ProjectResponse)
@@ -99,6 +127,10 @@ def create_project(
     )
     db.add(project_member)
     db.commit()
+    invalidate_access(current_user.id)
+    invalidate_project_lists([current_user.id])
+    
+    hub.publish("project.created", [current_user.id], project_id=db_project.id)
     
     db_project.total_tasks = 0
     db_project.completed_tasks = 0
@@ -121,16 +153,7 @@ def get_project(
         )
     
     # Check if user has access to this project
-    is_member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == project_id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    
-    if project.owner_id != current_user.id and not is_member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this project"
-        )
+    require_project_access(db, current_user.id, project_id, "Not authorized to access this project")
     
     # Calculate progress
     total_tasks = db.query(Task).filter(Task.project_id == project.id).count()
@@ -173,13 +196,23 @@ def update_project(
     if "due_date" in update_data and update_data["due_date"]:
         update_data["due_date"] = datetime.strptime(update_data["due_date"], "%Y-%m-%d").date()
     
+    renamed = "name" in update_data and update_data["name"] != project.name
     for field, value in update_data.items():
         setattr(project, field, value)
     
     project.updated_at = datetime.utcnow()
+    if renamed:
+        # Tasks carry project_name, so delta sync must send them again
+        touch_tasks(db, Task.project_id == project.id)
     db.commit()
     db.refresh(project)
     
+    # Notify the owner and members
+    audience = project_audience(db, project)
+    invalidate_dashboards(audience)
+    invalidate_project_lists(audience)
+    hub.publish("project.updated", audience, project_id=project.id)
+    
     # Calculate progress
     total_tasks = db.query(Task).filter(Task.project_id == project.id).count()
     completed_tasks = db.query(Task).filter(
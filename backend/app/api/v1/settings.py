@@ -1,18 +1,40 @@
-from typing import Optional
+from typing import Any, NamedTuple, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+import httpx
+import openai
+from anthropic import AsyncAnthropic
 from app.database import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.settings import UserSettings
 from app.config import settings as app_settings
+from app.core.cache import cache, invalidate
 
 router = APIRouter()
 
-# Initialize encryption
-fernet = Fernet(app_settings.ENCRYPTION_KEY.encode())
+# Initialize encryption: encrypt with the current key, decrypt with any of them
+fernet = MultiFernet([Fernet(key.encode()) for key in app_settings.encryption_keys])
+current_fernet = Fernet(app_settings.ENCRYPTION_KEY.encode())
+
+# AI settings of recently active users with their provider client already
+# built, keyed by user id. Decrypted keys only live inside these clients.
+ai_client_cache = cache("ai_client", ttl=app_settings.AI_CLIENT_CACHE_TTL_SECONDS, maxsize=1000)
+
+# One connection pool behind every cached client, so a client dropped from
+# the cache leaves no open connections behind; closed at shutdown
+ai_http_client = httpx.AsyncClient(
+    timeout=openai.DEFAULT_TIMEOUT,
+    limits=httpx.Limits(
+        max_connections=app_settings.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=app_settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS
+    )
+)
+
+# Fields that change which AI client a user gets
+AI_CLIENT_FIELDS = {"openai_api_key", "anthropic_api_key", "enable_ai_features", "preferred_ai_provider"}
 
 
 # Pydantic schemas
@@ -56,6 +78,62 @@ def decrypt_api_key(encrypted_key: str) -> str:
         return None
 
 
+def needs_rotation(encrypted_key: str) -> bool:
+    """Whether a stored key was encrypted with a retired key"""
+    try:
+        current_fernet.decrypt(encrypted_key.encode())
+        return False
+    except InvalidToken:
+        return True
+
+
+def rotate_api_key(encrypted_key: str) -> str:
+    """Re-encrypt a stored key with the current key"""
+    return fernet.rotate(encrypted_key.encode()).decode()
+
+
+class AIClientSettings(NamedTuple):
+    enable_ai_features: bool
+    preferred_ai_provider: str
+    # None when the preferred provider has no usable key
+    client: Any
+
+
+def build_ai_client(user_settings: UserSettings) -> AIClientSettings:
+    if user_settings.preferred_ai_provider == "openai":
+        api_key = decrypt_api_key(user_settings.openai_api_key_encrypted)
+        client = openai.AsyncOpenAI(api_key=api_key, http_client=ai_http_client) if api_key else None
+    else:
+        api_key = decrypt_api_key(user_settings.anthropic_api_key_encrypted)
+        client = AsyncAnthropic(api_key=api_key, http_client=ai_http_client) if api_key else None
+    return AIClientSettings(
+        enable_ai_features=user_settings.enable_ai_features,
+        preferred_ai_provider=user_settings.preferred_ai_provider,
+        client=client
+    )
+
+
+def load_ai_client_settings(db: Session, user_id: int) -> Optional[AIClientSettings]:
+    """A user's AI settings and client, built once and then served from the cache
+    
+    Returns None when the user has no settings row.
+    """
+    def load():
+        user_settings = db.query(UserSettings).filter(
+            UserSettings.user_id == user_id
+        ).first()
+        if user_settings is None:
+            return None
+        return build_ai_client(user_settings)
+    
+    return ai_client_cache.get_or_load(user_id, load)
+
+
+def invalidate_ai_client(user_id: int) -> None:
+    """Call after committing a change to a user's AI settings"""
+    invalidate(ai_client_cache.key(user_id))
+
+
 @router.get("/", response_model=SettingsResponse)
 def get_settings(
     db: Session = Depends(get_db),
@@ -70,6 +148,7 @@ def get_settings(
         settings = UserSettings(user_id=current_user.id)
         db.add(settings)
         db.commit()
+        invalidate_ai_client(current_user.id)
         db.refresh(settings)
     
     return {
@@ -93,12 +172,14 @@ def update_settings(
         UserSettings.user_id == current_user.id
     ).first()
     
-    if not settings:
+    created = settings is None
+    if created:
         settings = UserSettings(user_id=current_user.id)
         db.add(settings)
     
     # Update settings
     update_data = settings_update.dict(exclude_unset=True)
+    ai_client_changed = created or not AI_CLIENT_FIELDS.isdisjoint(update_data)
     
     # Handle API keys encryption
     if "openai_api_key" in update_data:
@@ -120,6 +201,8 @@ def update_settings(
         setattr(settings, field, value)
     
     db.commit()
+    if ai_client_changed:
+        invalidate_ai_client(current_user.id)
     db.refresh(settings)
     
     return {
@@ -1,14 +1,43 @@
 from typing import List, Optional
 from datetime import datetime, date
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, parse_fields, parse_sort
 from app.models.user import User
-from app.models.task import Task, Tag
-from app.models.project import Project, ProjectMember
+from app.models.task import TASK_SORT_EXPRESSIONS, Task
+from app.models.project import Project
 from app.models.enums import Priority, TaskStatus
+from app.crud.tasks import (
+    TASK_FIELDS,
+    add_task_tags,
+    decode_task_cursor,
+    encode_task_cursor,
+    fetch_task_dicts,
+    fetch_task_page,
+    mark_overdue_tasks,
+    order_task_query,
+    resolve_tag_ids,
+    tagged_tasks_filter,
+    task_audiences,
+    task_list_query,
+    task_list_version,
+    visible_tasks_filter,
+)
+from app.crud.access import accessible_project_ids, can_access_project
+from app.crud.dashboard import invalidate_dashboards
+from app.crud.projects import invalidate_project_lists
+from app.crud.search import task_search_matches
+from app.crud.changes import (
+    current_change_seq,
+    next_change_seq,
+    record_tombstones,
+    removed_task_ids,
+)
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.events import hub
 
 router = APIRouter()
 
@@ -66,70 +95,148 @@ class TaskResponse(BaseModel):
         from_attributes = True
 
 
+class TaskChangesResponse(BaseModel):
+    changes: List[TaskResponse]
+    removed: List[int]
+    cursor: int
+
+
 @router.get("/", response_model=List[TaskResponse])
 def get_tasks(
+    request: Request,
     project_id: Optional[int] = Query(None),
     status: Optional[TaskStatus] = Query(None),
     priority: Optional[Priority] = Query(None),
     inbox_only: bool = Query(False),
+    assignee_id: Optional[int] = Query(None),
+    due_from: Optional[date] = Query(None, description="Earliest due date, inclusive"),
+    due_to: Optional[date] = Query(None, description="Latest due date, inclusive"),
+    tag: Optional[str] = Query(None, description="Only tasks with this tag"),
+    sort: Optional[str] = Query(
+        None, description="due_date, priority, status, title or updated_at; prefix with - to reverse"
+    ),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; omit to return every task"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(
+        None, description="Comma separated subset of fields to return, e.g. id,title,status,due_date"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Base query - get tasks where user is assignee or creator
-    query = db.query(Task).filter(
-        (Task.assignee_id == current_user.id) | 
-        (Task.created_by_id == current_user.id)
-    )
+    fields = parse_fields(fields, TASK_FIELDS)
+    sort_key, descending = parse_sort(sort, tuple(TASK_SORT_EXPRESSIONS))
+    after = None
+    if cursor:
+        try:
+            after = decode_task_cursor(cursor, sort or "", sort_key)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Tasks where user is assignee, creator or project member
+    criteria = [visible_tasks_filter(current_user.id, accessible_project_ids(db, current_user.id))]
     
     # Apply filters
     if project_id:
-        query = query.filter(Task.project_id == project_id)
+        criteria.append(Task.project_id == project_id)
     if status:
-        query = query.filter(Task.status == status)
+        criteria.append(Task.status == status)
     if priority:
-        query = query.filter(Task.priority == priority)
+        criteria.append(Task.priority == priority)
     if inbox_only:
-        query = query.filter(Task.is_inbox == True)
+        criteria.append(Task.is_inbox == True)
+    if assignee_id:
+        criteria.append(Task.assignee_id == assignee_id)
+    if due_from:
+        criteria.append(Task.due_date >= due_from)
+    if due_to:
+        criteria.append(Task.due_date <= due_to)
+    if tag:
+        criteria.append(tagged_tasks_filter(tag))
+    
+    # Update overdue tasks
+    mark_overdue_tasks(db, criteria[0])
     
-    # Also include tasks from projects where user is a member
-    project_tasks = db.query(Task).join(Project).join(ProjectMember).filter(
-        ProjectMember.user_id == current_user.id
+    # Answer conditional requests before loading any rows
+    etag = make_etag(
+        current_user.id, request.url.query, date.today(), *task_list_version(db, *criteria)
     )
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    # Combine queries and remove duplicates
-    all_tasks = list({t.id: t for t in query.all() + project_tasks.all()}.values())
+    # Select only the requested columns in index order and serialize them directly
+    query = order_task_query(task_list_query(db, *criteria, fields=fields), sort_key, descending, after)
+    if limit is None:
+        return ORJSONResponse(fetch_task_dicts(db, query, fields), headers={"ETag": etag})
     
-    # Update overdue tasks
-    today = date.today()
-    for task in all_tasks:
-        if task.due_date and task.due_date < today and task.status != TaskStatus.COMPLETED:
-            task.status = TaskStatus.OVERDUE
-            db.commit()
+    # Keyset pagination: the next page starts after this page's last task
+    tasks, next_position = fetch_task_page(db, query, fields, sort_key, limit)
+    headers = {"ETag": etag}
+    if next_position is not None:
+        headers["X-Next-Cursor"] = encode_task_cursor(sort or "", next_position)
+    return ORJSONResponse(tasks, headers=headers)
+
+
+@router.get("/changes", response_model=TaskChangesResponse)
+def get_task_changes(
+    since: Optional[int] = Query(None, ge=0, description="Cursor from the previous sync; omit for a full sync"),
+    fields: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    fields = parse_fields(fields, TASK_FIELDS)
+    visible = visible_tasks_filter(current_user.id, accessible_project_ids(db, current_user.id))
     
-    # Format response
-    response_tasks = []
-    for task in all_tasks:
-        response_task = TaskResponse(
-            id=task.id,
-            title=task.title,
-            description=task.description,
-            priority=task.priority,
-            due_date=task.due_date,
-            status=task.status,
-            project_id=task.project_id,
-            project_name=task.project.name if task.project else None,
-            assignee_id=task.assignee_id,
-            assignee_name=task.assignee.name if task.assignee else None,
-            created_by_id=task.created_by_id,
-            is_inbox=task.is_inbox,
-            tags=[tag.name for tag in task.tags],
-            created_at=task.created_at,
-            updated_at=task.updated_at,
-            completed_at=task.completed_at
-        )
-        response_tasks.append(response_task)
+    # Update overdue tasks so the status change is part of this sync
+    mark_overdue_tasks(db, visible)
+    
+    # Everything up to the latest committed sequence is stable, so it
+    # becomes the next cursor
+    cursor = current_change_seq(db)
+    criteria = [visible, Task.change_seq <= cursor]
+    if since is not None:
+        criteria.append(Task.change_seq > since)
+    
+    query = task_list_query(db, *criteria, fields=fields).order_by(Task.change_seq, Task.id)
+    changes = fetch_task_dicts(db, query, fields)
+    
+    # Tasks that became visible again are reported as changes, not removals
+    changed_ids = {task["id"] for task in changes}
+    removed = [
+        task_id for task_id in removed_task_ids(db, current_user.id, since, cursor)
+        if task_id not in changed_ids
+    ] if since is not None else []
+    
+    return ORJSONResponse({"changes": changes, "removed": removed, "cursor": cursor})
+
+
+@router.get("/search", response_model=List[TaskResponse])
+def search_tasks(
+    q: str = Query(..., min_length=1, description="Words to find in titles, descriptions and tags"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    fields = parse_fields(fields, TASK_FIELDS)
+    
+    matches = task_search_matches(db, q)
+    if matches is None:
+        return ORJSONResponse([])
     
-    return response_tasks
+    # Best matches first, restricted to tasks the user can see
+    query = (
+        task_list_query(
+            db,
+            visible_tasks_filter(current_user.id, accessible_project_ids(db, current_user.id)),
+            fields=fields
+        )
+        .join(matches, matches.c.task_id == Task.id)
+        .order_by(matches.c.rank, Task.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    return ORJSONResponse(fetch_task_dicts(db, query, fields))
 
 
 @router.post("/", response_model=TaskResponse)
@@ -140,19 +247,14 @@ def create_task(
 ):
     # If project_id is provided, verify user has access
     if task_data.project_id:
-        project = db.query(Project).filter(Project.id == task_data.project_id).first()
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
-        
-        is_member = db.query(ProjectMember).filter(
-            ProjectMember.project_id == task_data.project_id,
-            ProjectMember.user_id == current_user.id
-        ).first()
-        
-        if project.owner_id != current_user.id and not is_member:
+        if not can_access_project(db, current_user.id, task_data.project_id):
+            project_exists = db.query(Project.id).filter(Project.id == task_data.project_id).first()
+            if not project_exists:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Project not found"
+                )
+            
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to create tasks in this project"
@@ -172,37 +274,30 @@ def create_task(
         is_inbox=task_data.is_inbox
     )
     
-    # Handle tags
-    for tag_name in task_data.tags:
-        tag = db.query(Tag).filter(Tag.name == tag_name).first()
-        if not tag:
-            tag = Tag(name=tag_name)
-            db.add(tag)
-        db_task.tags.append(tag)
-    
+    db_task.change_seq = next_change_seq(db)
     db.add(db_task)
+    db.flush()
+    
+    # Handle tags
+    tag_ids = resolve_tag_ids(db, task_data.tags)
+    add_task_tags(db, db_task.id, tag_ids.values())
     db.commit()
-    db.refresh(db_task)
     
-    # Format response
-    return TaskResponse(
-        id=db_task.id,
-        title=db_task.title,
-        description=db_task.description,
-        priority=db_task.priority,
-        due_date=db_task.due_date,
-        status=db_task.status,
+    # Notify everyone who can see the new task
+    audience = task_audiences(db, [db_task])[db_task.id]
+    invalidate_dashboards(audience)
+    invalidate_project_lists(audience)
+    hub.publish(
+        "task.created",
+        audience,
+        task_ids=[db_task.id],
         project_id=db_task.project_id,
-        project_name=db_task.project.name if db_task.project else None,
-        assignee_id=db_task.assignee_id,
-        assignee_name=db_task.assignee.name if db_task.assignee else None,
-        created_by_id=db_task.created_by_id,
-        is_inbox=db_task.is_inbox,
-        tags=[tag.name for tag in db_task.tags],
-        created_at=db_task.created_at,
-        updated_at=db_task.updated_at,
-        completed_at=db_task.completed_at
+        cursor=db_task.change_seq
     )
+    
+    # Format response
+    task = fetch_task_dicts(db, task_list_query(db, Task.id == db_task.id))[0]
+    return ORJSONResponse(task)
 
 
 @router.put("/bulk", response_model=dict)
@@ -221,27 +316,31 @@ def bulk_update_tasks(
         )
     
     # Verify user has access to all tasks
+    project_ids = accessible_project_ids(db, current_user.id)
     for task in tasks:
         has_access = (
             task.assignee_id == current_user.id or
-            task.created_by_id == current_user.id
+            task.created_by_id == current_user.id or
+            task.project_id in project_ids
         )
         
-        if task.project:
-            is_member = db.query(ProjectMember).filter(
-                ProjectMember.project_id == task.project_id,
-                ProjectMember.user_id == current_user.id
-            ).first()
-            has_access = has_access or task.project.owner_id == current_user.id or is_member
-        
         if not has_access:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Not authorized to update task {task.id}"
             )
     
+    # Remember who could see the tasks before the update
+    audiences_before = task_audiences(db, tasks)
+    
     # Update tasks
     update_data = bulk_update.dict(exclude_unset=True, exclude={"task_ids"})
+    if update_data.get("project_id") and update_data["project_id"] not in project_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to move tasks to this project"
+        )
+    change_seq = next_change_seq(db)
     for task in tasks:
         for field, value in update_data.items():
             if value is not None:
@@ -251,10 +350,30 @@ def bulk_update_tasks(
             task.completed_at = datetime.utcnow()
         
         task.updated_at = datetime.utcnow()
+        task.change_seq = change_seq
+    
+    # Users who can no longer see a task get a tombstone for delta sync
+    audiences_after = audiences_before
+    if "project_id" in update_data or "assignee_id" in update_data:
+        audiences_after = task_audiences(db, tasks)
+        record_tombstones(db, audiences_before, audiences_after, change_seq)
     
+    # Read ids before commit expires the tasks
+    task_ids = [task.id for task in tasks]
     db.commit()
     
+    # Notify everyone who could see the tasks before or after the update
+    audience = set().union(*audiences_before.values(), *audiences_after.values())
+    invalidate_dashboards(audience)
+    invalidate_project_lists(audience)
+    hub.publish(
+        "task.updated",
+        audience,
+        task_ids=task_ids,
+        cursor=change_seq
+    )
+    
     return {
-        "message": f"Updated {len(tasks)} tasks successfully",
-        "updated_count": len(tasks)
+        "message": f"Updated {len(task_ids)} tasks successfully",
+        "updated_count": len(task_ids)
     }
\ No newline at end of file
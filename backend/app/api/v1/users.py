@@ -1,11 +1,16 @@
 from typing import Optional
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 from app.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_db_user, user_cache
 from app.models.user import User
+from app.models.task import Task
 from app.api.v1.auth import get_password_hash, verify_password
+from app.crud.changes import touch_tasks
+from app.crud.refresh_tokens import revoke_refresh_tokens
+from app.core.cache import invalidate
 
 router = APIRouter()
 
@@ -30,8 +35,8 @@ class UserResponse(BaseModel):
     role: str
     department: Optional[str]
     avatar_url: Optional[str]
-    created_at: str
-    last_login: Optional[str]
+    created_at: datetime
+    last_login: Optional[datetime]
     
     class Config:
         from_attributes = True
@@ -39,7 +44,7 @@ class UserResponse(BaseModel):
 
 @router.get("/me", response_model=UserResponse)
 def get_current_user_profile(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     return current_user
 
@@ -48,7 +53,7 @@ def get_current_user_profile(
 def update_user_profile(
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     # Check if email is being changed and if it's already taken
     if user_update.email and user_update.email != current_user.email:
@@ -61,10 +66,15 @@ def update_user_profile(
     
     # Update user fields
     update_data = user_update.dict(exclude_unset=True)
+    renamed = "name" in update_data and update_data["name"] != current_user.name
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
+    if renamed:
+        # Tasks carry assignee_name, so delta sync must send them again
+        touch_tasks(db, Task.assignee_id == current_user.id)
     db.commit()
+    invalidate(user_cache.key(current_user.id))
     db.refresh(current_user)
     
     return current_user
@@ -74,7 +84,7 @@ def update_user_profile(
 def change_password(
     password_data: PasswordChange,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     # Verify current password
     if not verify_password(password_data.current_password, current_user.hashed_password):
@@ -85,6 +95,9 @@ def change_password(
     
     # Update password
     current_user.hashed_password = get_password_hash(password_data.new_password)
+    # Sessions started with the old password can no longer be renewed
+    revoke_refresh_tokens(db, user_id=current_user.id)
     db.commit()
+    invalidate(user_cache.key(current_user.id))
     
     return {"message": "Password updated successfully"}
\ No newline at end of file
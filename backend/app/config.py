@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 import os
 
 
@@ -12,9 +12,18 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Used refresh tokens are kept this long to detect their replay
+    REFRESH_TOKEN_REPLAY_WINDOW_MINUTES: int = 60
+    # Trust user claims in access tokens instead of loading the user on every
+    # request; a deactivation takes effect within REVOCATION_REFRESH_SECONDS
+    STATELESS_AUTH: bool = False
+    REVOCATION_REFRESH_SECONDS: int = 30
     
-    # Encryption
+    # Encryption: new values use ENCRYPTION_KEY; comma-separated retired keys
+    # stay readable until scripts/rotate_encryption_key.py has re-encrypted them
     ENCRYPTION_KEY: str
+    OLD_ENCRYPTION_KEYS: str = ""
     
     # CORS
     FRONTEND_URL: str = "http://localhost:3000"
@@ -22,12 +31,76 @@ class Settings(BaseSettings):
     # Environment
     ENVIRONMENT: str = "development"
     
+    # Pub/sub backend for cross-worker messages: "memory" or "postgres"
+    PUBSUB_BACKEND: str = "memory"
+    
+    # Live events: pending events per connection before it must resync
+    EVENT_QUEUE_SIZE: int = 100
+    
+    # In-process caches (kept consistent across workers by the invalidation bus)
+    USER_CACHE_TTL_SECONDS: int = 60
+    TAG_CACHE_TTL_SECONDS: int = 3600
+    ACCESS_CACHE_TTL_SECONDS: int = 300
+    DASHBOARD_CACHE_TTL_SECONDS: int = 30
+    AI_CLIENT_CACHE_TTL_SECONDS: int = 600
+    PROJECT_LIST_CACHE_TTL_SECONDS: int = 60
+    CONVERSATION_SUMMARY_CACHE_TTL_SECONDS: int = 60
+    
+    # Connections to the AI providers, pooled for all users of a worker
+    AI_HTTP_MAX_CONNECTIONS: int = 200
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 40
+    
+    # Seconds between writes of buffered low-value updates such as last_login
+    WRITE_BEHIND_FLUSH_SECONDS: float = 5
+    
+    # Token-bucket rate limits: requests per minute and burst size per user or
+    # login email, times RATE_LIMIT_IP_FACTOR per client IP; "memory" keeps
+    # buckets per worker, "postgres" shares them across workers
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_LOGIN_PER_MINUTE: float = 10
+    RATE_LIMIT_LOGIN_BURST: int = 10
+    RATE_LIMIT_CHAT_PER_MINUTE: float = 20
+    RATE_LIMIT_CHAT_BURST: int = 10
+    RATE_LIMIT_IP_FACTOR: float = 5
+    
+    # POST /batch: most sub-requests per batch, and how many of its reads
+    # run at once
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_READ_CONCURRENCY: int = 5
+    
+    # Idempotency-Key: how long responses are replayed, how long a duplicate
+    # waits for the request holding its key, and how often expired keys go
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_WAIT_SECONDS: float = 30
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 3600
+    
+    # Archive job: age at which completed tasks and idle AI conversations
+    # move to the archive tables, and rows moved per transaction
+    ARCHIVE_TASKS_AFTER_DAYS: int = 365
+    ARCHIVE_CONVERSATIONS_AFTER_DAYS: int = 180
+    ARCHIVE_BATCH_SIZE: int = 500
+    
+    # Monthly ai_messages partitions (Postgres) to keep created ahead of time
+    AI_PARTITION_MONTHS_AHEAD: int = 3
+    
+    # AI message bodies at least this long are stored compressed;
+    # "zlib", or "zstd" when the zstandard package is installed
+    COMPRESSION_THRESHOLD_BYTES: int = 1024
+    COMPRESSION_CODEC: str = "zlib"
+    
     @property
     def database_url(self) -> str:
         if self.ENVIRONMENT == "production" and self.DATABASE_URL_POSTGRES:
             return self.DATABASE_URL_POSTGRES
         return self.DATABASE_URL_SQLITE
     
+    @property
+    def encryption_keys(self) -> List[str]:
+        """Current key first, then the retired ones"""
+        old_keys = [key.strip() for key in self.OLD_ENCRYPTION_KEYS.split(",") if key.strip()]
+        return [self.ENCRYPTION_KEY] + old_keys
+    
     @property
     def is_production(self) -> bool:
         return self.ENVIRONMENT == "production"
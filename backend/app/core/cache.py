@@ -0,0 +1,240 @@
+"""
+In-process caches that stay correct across workers.
+
+Cache keys look like "<namespace>:<id>". Writers call invalidate() with the
+keys they touched; the invalidation bus evicts them locally right away and
+broadcasts them through the pub/sub broker so every other worker evicts
+them too.
+"""
+import functools
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+from app.core.pubsub import broker
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+# Above this many broker messages, other workers clear the namespaces instead
+MAX_INVALIDATION_MESSAGES = 4
+
+_MISSING = object()
+
+
+class _Flight:
+    """A load in progress that other callers of the same key wait for"""
+    
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds
+    
+    Each entry's TTL is spread by up to ``jitter`` (a fraction) either way so
+    entries loaded together don't all expire together. Tuple idents are
+    grouped by their first element: evicting that element, e.g. a user id,
+    evicts every entry of the group.
+    """
+    
+    def __init__(self, namespace: str, ttl: float, maxsize: int = 10000, jitter: float = 0.0):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.jitter = jitter
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._groups: Dict[Hashable, Set[Hashable]] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+    
+    def key(self, ident) -> str:
+        return f"{self.namespace}:{ident}"
+    
+    def get(self, ident, default=None):
+        with self._lock:
+            entry = self._entries.get(ident)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(ident)
+                return default
+            self._entries.move_to_end(ident)
+            return value
+    
+    def set(self, ident, value, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._store(ident, value, ttl)
+    
+    def get_or_load(self, ident, loader: Callable[[], Any], ttl: Optional[float] = None):
+        """Return the cached value, calling ``loader`` on a miss
+        
+        Concurrent misses for the same key share one load: the first caller
+        runs ``loader`` and the others wait for its result (or exception).
+        A value loaded while the key was being invalidated is returned but
+        not cached, so a slow read can't resurrect stale data, and callers
+        arriving after the invalidation load for themselves.
+        """
+        value = self.get(ident, _MISSING)
+        if value is not _MISSING:
+            return value
+        
+        group = _group(ident)
+        with self._lock:
+            generation = self._generations.get(group, 0)
+            flight = self._flights.get(ident)
+            leader = flight is None or flight.generation != generation
+            if leader:
+                flight = self._flights[ident] = _Flight(generation)
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        
+        try:
+            flight.value = loader()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(ident) is flight:
+                    del self._flights[ident]
+                if flight.error is None and self._generations.get(group, 0) == generation:
+                    self._store(ident, flight.value, ttl)
+            flight.done.set()
+        return flight.value
+    
+    def evict(self, ident) -> None:
+        with self._lock:
+            self._remove(ident)
+            for member in self._groups.pop(ident, ()):
+                self._entries.pop(member, None)
+            group = _group(ident)
+            self._generations[group] = self._generations.get(group, 0) + 1
+            if len(self._generations) > self.maxsize * 2:
+                # Old generations only matter for loads in flight right now
+                self._generations.clear()
+    
+    def clear(self) -> None:
+        with self._lock:
+            for ident in self._entries:
+                group = _group(ident)
+                self._generations[group] = self._generations.get(group, 0) + 1
+            self._entries.clear()
+            self._groups.clear()
+    
+    def _store(self, ident, value, ttl: Optional[float]) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if self.jitter:
+            ttl *= 1 + random.uniform(-self.jitter, self.jitter)
+        self._entries[ident] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(ident)
+        if isinstance(ident, tuple):
+            self._groups.setdefault(ident[0], set()).add(ident)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+    
+    def _remove(self, ident) -> None:
+        self._entries.pop(ident, None)
+        if isinstance(ident, tuple):
+            members = self._groups.get(ident[0])
+            if members is not None:
+                members.discard(ident)
+                if not members:
+                    del self._groups[ident[0]]
+
+
+def _group(ident):
+    return ident[0] if isinstance(ident, tuple) else ident
+
+
+class InvalidationBus:
+    def __init__(self):
+        self.caches: Dict[str, List[TTLCache]] = {}
+        broker.subscribe(INVALIDATION_CHANNEL, self._on_message)
+    
+    def register(self, cache: TTLCache) -> TTLCache:
+        self.caches.setdefault(cache.namespace, []).append(cache)
+        return cache
+    
+    def invalidate(self, *keys: str) -> None:
+        """Evict keys in this worker and broadcast them to the others
+        
+        "namespace:*" clears a whole namespace. Long key lists reach other
+        workers in several messages, or as namespace clears when they would
+        need more than MAX_INVALIDATION_MESSAGES.
+        """
+        keys = sorted(set(keys))
+        if not keys:
+            return
+        self._evict(keys)
+        messages = broker.split({"keys": keys}, "keys")
+        if len(messages) > MAX_INVALIDATION_MESSAGES:
+            namespaces = sorted({key.partition(":")[0] for key in keys})
+            messages = broker.split({"keys": [f"{namespace}:*" for namespace in namespaces]}, "keys")
+        broker.publish(INVALIDATION_CHANNEL, *messages)
+    
+    def _on_message(self, message: dict) -> None:
+        self._evict(message["keys"])
+    
+    def _evict(self, keys) -> None:
+        for key in keys:
+            namespace, _, ident = key.partition(":")
+            for cache in self.caches.get(namespace, ()):
+                if ident == "*":
+                    cache.clear()
+                else:
+                    cache.evict(_parse_ident(ident))
+
+
+def _parse_ident(ident: str):
+    # Keys are strings on the wire; numeric ids are cached as ints
+    return int(ident) if ident.isdigit() else ident
+
+
+bus = InvalidationBus()
+
+
+def cache(namespace: str, ttl: float, maxsize: int = 10000, jitter: float = 0.0) -> TTLCache:
+    """Create a cache that the invalidation bus keeps consistent"""
+    return bus.register(TTLCache(namespace, ttl, maxsize, jitter))
+
+
+def cached(
+    namespace: str,
+    ttl: float,
+    key: Callable[..., Hashable],
+    maxsize: int = 10000,
+    jitter: float = 0.1,
+):
+    """Cache a function's results under ``key(*args, **kwargs)``
+    
+    For per-user results, make the key a tuple starting with the user id;
+    invalidate("<namespace>:<user id>") then drops all of that user's
+    entries. Concurrent misses share one call (see TTLCache.get_or_load).
+    Results are shared between callers, so return immutable or serialized
+    data rather than ORM objects. The cache is available as ``.cache``.
+    """
+    def decorator(func):
+        func_cache = cache(namespace, ttl, maxsize, jitter)
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return func_cache.get_or_load(key(*args, **kwargs), lambda: func(*args, **kwargs))
+        
+        wrapper.cache = func_cache
+        return wrapper
+    
+    return decorator
+
+
+def invalidate(*keys: str) -> None:
+    bus.invalidate(*keys)
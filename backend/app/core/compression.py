@@ -0,0 +1,68 @@
+"""
+Compressed storage for long text columns.
+
+Text at or above COMPRESSION_THRESHOLD_BYTES is stored compressed in a
+binary column next to a codec marker. The text column keeps a short
+preview, so list views can read it without touching the blob. Rows
+written before compression, or too short to benefit, keep their full
+text and no codec. zlib is always available. zstd needs the optional
+``zstandard`` package.
+"""
+import zlib
+from typing import Optional, Tuple
+from app.config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Characters of compressed text kept in the plain column
+PREVIEW_LENGTH = 200
+
+
+def available_codecs() -> Tuple[str, ...]:
+    return ("zlib", "zstd") if zstandard is not None else ("zlib",)
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    raise ValueError(f"Unsupported compression codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed data needs the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unsupported compression codec: {codec}")
+
+
+def pack_text(text: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[bytes]]:
+    """Split text into (plain column, codec, blob) for storage
+    
+    Short or incompressible text is stored plain with no codec.
+    """
+    if text is None:
+        return None, None, None
+    data = text.encode()
+    if len(data) < settings.COMPRESSION_THRESHOLD_BYTES:
+        return text, None, None
+    
+    codec = settings.COMPRESSION_CODEC
+    blob = compress(data, codec)
+    if len(blob) >= len(data):
+        return text, None, None
+    return text[:PREVIEW_LENGTH], codec, blob
+
+
+def unpack_text(plain: Optional[str], codec: Optional[str], blob: Optional[bytes]) -> Optional[str]:
+    """Inverse of pack_text"""
+    if codec is None:
+        return plain
+    return decompress(blob, codec).decode()
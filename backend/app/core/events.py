@@ -0,0 +1,85 @@
+"""
+Live change events pushed to connected clients.
+
+Routers publish small events (ids only) after committing a write. The
+broker carries them to every worker, and each worker's hub hands them to
+the local connections of the users in the event's audience.
+"""
+import asyncio
+from typing import Dict, Iterable, Optional, Set
+from app.config import settings
+from app.core.pubsub import broker
+
+EVENTS_CHANNEL = "change_events"
+
+# Sent in place of dropped events when a consumer falls behind
+RESYNC_EVENT = {"type": "resync"}
+
+
+class Subscriber:
+    """A connected client with a bounded queue of pending events"""
+    
+    def __init__(self, user_id: int, max_queue: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+    
+    def push(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop its backlog and ask it to resync instead of
+            # buffering without bound or blocking other subscribers
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+
+class EventHub:
+    def __init__(self, max_queue: int):
+        self.max_queue = max_queue
+        self.subscribers: Dict[int, Set[Subscriber]] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        broker.subscribe(EVENTS_CHANNEL, self._on_message)
+    
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Bind to the server's event loop; events are dropped until then"""
+        self.loop = loop
+    
+    def connect(self, user_id: int) -> Subscriber:
+        subscriber = Subscriber(user_id, self.max_queue)
+        self.subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+    
+    def disconnect(self, subscriber: Subscriber) -> None:
+        subscribers = self.subscribers.get(subscriber.user_id)
+        if subscribers:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[subscriber.user_id]
+    
+    def publish(self, event_type: str, user_ids: Iterable[int], **payload) -> None:
+        """Send an event to every connected member of its audience"""
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return
+        # Large audiences go out in several messages; a payload too large
+        # for any message becomes a resync, so clients refetch instead
+        messages = (
+            broker.split({"type": event_type, "user_ids": user_ids, **payload}, "user_ids")
+            or broker.split({**RESYNC_EVENT, "user_ids": user_ids}, "user_ids")
+        )
+        broker.publish(EVENTS_CHANNEL, *messages)
+    
+    def _on_message(self, message: dict) -> None:
+        # Broker handlers can run on any thread; hop onto the event loop
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._deliver, message)
+    
+    def _deliver(self, message: dict) -> None:
+        event = {key: value for key, value in message.items() if key != "user_ids"}
+        for user_id in message["user_ids"]:
+            for subscriber in list(self.subscribers.get(user_id, ())):
+                subscriber.push(event)
+
+
+hub = EventHub(max_queue=settings.EVENT_QUEUE_SIZE)
@@ -0,0 +1,279 @@
+"""
+Idempotency-Key support for POST endpoints that must not run twice.
+
+The first request carrying a key inserts an idempotency_keys row before
+the endpoint runs. The unique (user_id, key) constraint makes that insert
+a lock that holds across workers. The response is then stored on the row
+and replayed to retries until the key expires. A duplicate arriving while
+the first request is still running waits for its response instead of
+running the endpoint again.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from jose import jwt, JWTError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.database import engine
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Client errors a retry may not repeat; like server errors and redirects
+# they release the key instead of being stored
+RETRYABLE_STATUSES = {401, 403, 408, 409, 425, 429}
+
+# Delay between checks on a duplicate that is still running
+POLL_INTERVAL_SECONDS = 0.05
+MAX_POLL_INTERVAL_SECONDS = 0.5
+
+# Keys still unanswered after this long belong to a crashed worker
+ABANDONED_AFTER = timedelta(minutes=5)
+
+keys = IdempotencyKey.__table__
+
+
+def _should_store(status_code: int) -> bool:
+    return 200 <= status_code < 300 or (400 <= status_code < 500 and status_code not in RETRYABLE_STATUSES)
+
+
+def _request_hash(scope: Scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (scope["method"], scope["path"].rstrip("/"), scope.get("query_string", b"").decode("latin-1")):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _token_user_id(scope: Scope) -> Optional[int]:
+    """User id from the bearer token; None lets the endpoint reject the request"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            try:
+                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                return int(payload["sub"])
+            except (JWTError, KeyError, TypeError, ValueError):
+                return None
+    return None
+
+
+def _claim(user_id: int, key: str, request_hash: str) -> Tuple[Optional[int], Optional[tuple]]:
+    """Insert the key for this request
+    
+    Returns (claimed row id, None) when this request owns the key, or
+    (None, existing row) when another request got there first. (None, None)
+    means the key could not be claimed, e.g. for a deleted user.
+    """
+    for _ in range(3):
+        now = datetime.utcnow()
+        try:
+            with engine.begin() as conn:
+                result = conn.execute(insert(keys).values(
+                    user_id=user_id,
+                    key=key,
+                    request_hash=request_hash,
+                    created_at=now,
+                    expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+                ))
+            return result.inserted_primary_key[0], None
+        except IntegrityError:
+            pass
+        
+        with engine.begin() as conn:
+            row = _load(conn, user_id, key)
+            if row is None:
+                # Released in the meantime
+                continue
+            abandoned = row.status_code is None and row.created_at < now - ABANDONED_AFTER
+            if row.expires_at > now and not abandoned:
+                return None, row
+            # Expired but not purged yet, or never answered
+            conn.execute(delete(keys).where(keys.c.id == row.id))
+    return None, None
+
+
+def _load(conn, user_id: int, key: str):
+    return conn.execute(
+        select(keys.c.id, keys.c.request_hash, keys.c.status_code, keys.c.headers, keys.c.body,
+               keys.c.created_at, keys.c.expires_at)
+        .where(keys.c.user_id == user_id, keys.c.key == key)
+    ).first()
+
+
+def _lookup(user_id: int, key: str):
+    with engine.connect() as conn:
+        return _load(conn, user_id, key)
+
+
+def _store(claim_id: int, status_code: int, headers: List[List[str]], body: bytes) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            update(keys).where(keys.c.id == claim_id)
+            .values(status_code=status_code, headers=headers, body=body)
+        )
+
+
+def _release(claim_id: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(delete(keys).where(keys.c.id == claim_id))
+
+
+def purge_expired_keys() -> int:
+    with engine.begin() as conn:
+        return conn.execute(delete(keys).where(keys.c.expires_at <= datetime.utcnow())).rowcount
+
+
+async def purge_expired_keys_forever(interval: float) -> None:
+    """Delete expired keys every ``interval`` seconds; run as a lifespan task"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            purged = await run_in_threadpool(purge_expired_keys)
+            if purged:
+                logger.info("Purged %s expired idempotency keys", purged)
+        except Exception:
+            logger.exception("Purging idempotency keys failed")
+
+
+def _error(status_code: int, detail: str, headers: Optional[dict] = None) -> Response:
+    return JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+
+
+def _replay(row) -> Response:
+    response = Response(content=row.body, status_code=row.status_code)
+    response.raw_headers = [
+        (name.encode("latin-1"), value.encode("latin-1")) for name, value in row.headers
+    ] + [(REPLAYED_HEADER.lower().encode(), b"true")]
+    return response
+
+
+class IdempotencyMiddleware:
+    """Honours Idempotency-Key on POST requests to the given paths
+    
+    Keys are scoped to the user of the bearer token. Requests without a key
+    or without a valid token pass straight through.
+    """
+    
+    def __init__(self, app: ASGIApp, paths: Iterable[str]):
+        self.app = app
+        self.paths = {path.rstrip("/") for path in paths}
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"].rstrip("/") not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        key = next((value for name, value in scope["headers"] if name == IDEMPOTENCY_HEADER), None)
+        user_id = _token_user_id(scope) if key is not None else None
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+        
+        key = key.decode("latin-1").strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _error(400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")(scope, receive, send)
+            return
+        
+        # The body is part of the request fingerprint, so read it up front
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        request_hash = _request_hash(scope, body)
+        
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        interval = POLL_INTERVAL_SECONDS
+        while True:
+            claim_id, row = await run_in_threadpool(_claim, user_id, key, request_hash)
+            if row is None:
+                break
+            
+            if row.request_hash != request_hash:
+                response = _error(422, "Idempotency-Key was already used for a different request")
+                await response(scope, receive, send)
+                return
+            
+            # Wait for the request holding the key to store or release it
+            while row is not None and row.status_code is None and time.monotonic() < deadline:
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, MAX_POLL_INTERVAL_SECONDS)
+                row = await run_in_threadpool(_lookup, user_id, key)
+            
+            if row is None:
+                # Released without a response: claim it and run this request
+                continue
+            if row.status_code is None:
+                response = _error(
+                    409, "A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": "1"},
+                )
+            else:
+                response = _replay(row)
+            await response(scope, receive, send)
+            return
+        
+        await self._run(scope, receive, send, body, claim_id)
+    
+    async def _run(self, scope: Scope, receive: Receive, send: Send, body: bytes, claim_id: Optional[int]) -> None:
+        body_sent = False
+        
+        async def receive_body() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+        
+        status_code = None
+        headers: List[List[str]] = []
+        chunks: List[bytes] = []
+        
+        async def send_and_capture(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+        
+        if claim_id is None:
+            await self.app(scope, receive_body, send)
+            return
+        
+        try:
+            await self.app(scope, receive_body, send_and_capture)
+        except BaseException:
+            await run_in_threadpool(_release, claim_id)
+            raise
+        
+        if status_code is not None and _should_store(status_code):
+            await run_in_threadpool(_store, claim_id, status_code, headers, b"".join(chunks))
+        else:
+            await run_in_threadpool(_release, claim_id)
@@ -0,0 +1,204 @@
+"""
+Message brokers for fanning messages out across the app.
+
+InMemoryBroker delivers within a single process. PostgresBroker uses
+LISTEN/NOTIFY so every uvicorn worker connected to the same database sees
+every message. Handlers may be called from any thread and must be quick and
+thread-safe.
+"""
+import json
+import logging
+import select
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import text
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], None]
+
+
+class Broker(ABC):
+    # Largest encoded message the transport carries; None for no limit
+    max_payload_bytes: Optional[int] = None
+    
+    def __init__(self):
+        self.handlers: Dict[str, List[Handler]] = {}
+    
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self.handlers.setdefault(channel, []).append(handler)
+    
+    def publish(self, channel: str, *messages: dict) -> None:
+        """Deliver messages to every handler subscribed to ``channel``
+        
+        Callers publish after committing, so failures are logged, never
+        raised: a lost message must not turn a saved write into an error.
+        Messages over ``max_payload_bytes`` are dropped; use split() first.
+        """
+        sendable = []
+        for message in messages:
+            if self.max_payload_bytes is not None and len(_encode(message)) > self.max_payload_bytes:
+                logger.error("Dropped a message over %s bytes on channel %s", self.max_payload_bytes, channel)
+            else:
+                sendable.append(message)
+        if not sendable:
+            return
+        try:
+            self._send(channel, sendable)
+        except Exception:
+            logger.exception("Publishing to channel %s failed", channel)
+    
+    def split(self, message: dict, key: str) -> List[dict]:
+        """Copies of ``message`` sharing out the list ``message[key]`` so each fits
+        
+        Returns [] when the message is too large even with a single item.
+        """
+        if self.max_payload_bytes is None:
+            return [message]
+        limit = self.max_payload_bytes
+        base = len(_encode({**message, key: []}))
+        if base > limit:
+            return []
+        
+        chunks, chunk, size = [], [], base
+        for item in message[key]:
+            # Each item also costs a ", " separator
+            item_size = len(_encode(item)) + 2
+            if base + item_size > limit:
+                return []
+            if size + item_size > limit:
+                chunks.append(chunk)
+                chunk, size = [], base
+            chunk.append(item)
+            size += item_size
+        if chunk or not chunks:
+            chunks.append(chunk)
+        return [{**message, key: chunk} for chunk in chunks]
+    
+    @abstractmethod
+    def _send(self, channel: str, messages: List[dict]) -> None:
+        """Transport messages that are known to fit"""
+    
+    def start(self) -> None:
+        pass
+    
+    def stop(self) -> None:
+        pass
+    
+    def _dispatch(self, channel: str, message: dict) -> None:
+        for handler in self.handlers.get(channel, []):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Handler for channel %s failed", channel)
+
+
+def _encode(message) -> str:
+    return json.dumps(message, default=str)
+
+
+class InMemoryBroker(Broker):
+    """Delivers messages synchronously to handlers in this process"""
+    
+    def _send(self, channel: str, messages: List[dict]) -> None:
+        for message in messages:
+            self._dispatch(channel, message)
+
+
+class PostgresBroker(Broker):
+    """Delivers messages to every worker through Postgres LISTEN/NOTIFY
+    
+    Payloads are JSON and must stay under Postgres' 8000 byte NOTIFY limit,
+    so publish ids and let clients fetch the data; split() shares long id
+    lists across several messages. Publishing uses one dedicated autocommit
+    connection and sends all of a call's messages in a single statement.
+    """
+    
+    max_payload_bytes = 7900
+    
+    NOTIFY = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload")
+    
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        self._stop = threading.Event()
+        self._thread = None
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+    
+    def _send(self, channel: str, messages: List[dict]) -> None:
+        payloads = [_encode(message) for message in messages]
+        with self._publish_lock:
+            if self._publish_conn is None:
+                self._publish_conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            try:
+                self._publish_conn.execute(self.NOTIFY, {"channel": channel, "payloads": payloads})
+            except Exception:
+                # Reconnect on the next publish
+                self._close_publish_conn()
+                raise
+    
+    def _close_publish_conn(self) -> None:
+        conn, self._publish_conn = self._publish_conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                logger.exception("Closing the publish connection failed")
+    
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._listen_forever, name="pg-listener", daemon=True)
+            self._thread.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._publish_lock:
+            self._close_publish_conn()
+    
+    def _listen_forever(self) -> None:
+        # Reconnect with a short pause if the listening connection drops
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("LISTEN connection failed, reconnecting")
+                self._stop.wait(2)
+    
+    def _listen(self) -> None:
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+        
+        dsn = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        conn = psycopg2.connect(dsn)
+        try:
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                for channel in self.handlers:
+                    cursor.execute(f'LISTEN "{channel}"')
+            
+            while not self._stop.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    self._dispatch(notify.channel, json.loads(notify.payload))
+        finally:
+            conn.close()
+
+
+def create_broker() -> Broker:
+    if settings.PUBSUB_BACKEND == "postgres":
+        from app.database import engine
+        return PostgresBroker(engine)
+    return InMemoryBroker()
+
+
+broker = create_broker()
@@ -0,0 +1,145 @@
+"""
+Token-bucket rate limits for expensive endpoints.
+
+Each limited route has a RateLimiter with a refill rate and a burst size.
+Its buckets are keyed by client IP and by user (or by the email being tried
+on login); IP buckets are RATE_LIMIT_IP_FACTOR times larger. A bucket
+starts full, every request takes one token, and tokens come back at
+``per_minute / 60`` per second. An empty bucket rejects the request with
+429 and a Retry-After header. Limiters run as route dependencies, so a
+rejection happens before bcrypt or a provider call.
+
+Buckets live in a store. MemoryRateLimitStore keeps them in this process
+in an LRU of bounded size, with O(1) work per request; each worker then
+enforces its own limit. PostgresRateLimitStore keeps one row per bucket,
+updated with a single upsert, so the limit holds across all workers.
+RATE_LIMIT_BACKEND selects the store.
+"""
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Tuple
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import text
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitStore(ABC):
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket; returns 0 if allowed, else seconds until one is available"""
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Buckets in this process, dropping the least recently used beyond ``maxsize``"""
+    
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / rate
+
+
+class PostgresRateLimitStore(RateLimitStore):
+    """Buckets in the rate_limit_buckets table, shared by every worker
+    
+    Idle buckets are full again after ``burst / rate`` seconds, so rows
+    untouched for an hour are deleted now and then.
+    """
+    
+    PURGE_INTERVAL_SECONDS = 600
+    
+    # Tokens in the bucket right now, before this request takes one
+    REFILLED = "least(:burst, bucket.tokens + :rate * extract(epoch FROM now() - bucket.updated_at))"
+    
+    TAKE = text(f"""
+        INSERT INTO rate_limit_buckets AS bucket (key, tokens, allowed, updated_at)
+        VALUES (:key, :burst - 1, true, now())
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = {REFILLED} - CASE WHEN {REFILLED} >= 1 THEN 1 ELSE 0 END,
+            allowed = {REFILLED} >= 1,
+            updated_at = now()
+        RETURNING tokens, allowed
+    """)
+    
+    def __init__(self, engine):
+        self.engine = engine
+        self._next_purge = 0.0
+    
+    def take(self, key: str, rate: float, burst: int) -> float:
+        with self.engine.begin() as conn:
+            tokens, allowed = conn.execute(self.TAKE, {"key": key, "rate": rate, "burst": burst}).one()
+            if time.monotonic() >= self._next_purge:
+                self._next_purge = time.monotonic() + self.PURGE_INTERVAL_SECONDS
+                conn.execute(text("DELETE FROM rate_limit_buckets WHERE updated_at < now() - interval '1 hour'"))
+        return 0.0 if allowed else (1 - tokens) / rate
+
+
+def create_store() -> RateLimitStore:
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        from app.database import engine
+        return PostgresRateLimitStore(engine)
+    return MemoryRateLimitStore()
+
+
+store = create_store()
+
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy, run uvicorn with --proxy-headers so this is the real client
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """Buckets of one route; IP buckets are ``ip_factor`` times larger and faster,
+    since several users can share an address"""
+    
+    def __init__(self, name: str, per_minute: float, burst: int, ip_factor: float = None):
+        self.name = name
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.ip_factor = settings.RATE_LIMIT_IP_FACTOR if ip_factor is None else ip_factor
+    
+    def check(self, *keys: Tuple[str, object]) -> None:
+        """Take a token from each (kind, value) bucket or raise 429"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        for kind, value in keys:
+            try:
+                factor = self.ip_factor if kind == "ip" else 1
+                retry_after = store.take(f"{self.name}:{kind}:{value}", self.rate * factor, int(self.burst * factor))
+            except Exception:
+                # Fail open: a broken store must not take the endpoint down
+                logger.exception("Rate limit store failed")
+                return
+            if retry_after:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests, please slow down",
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+                )
+
+
+def limit_by_user(limiter: RateLimiter, get_user):
+    """Route dependency applying ``limiter`` per client IP and per authenticated user"""
+    def dependency(request: Request, current_user=Depends(get_user)):
+        limiter.check(("user", current_user.id), ("ip", client_ip(request)))
+    
+    return dependency
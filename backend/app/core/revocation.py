@@ -0,0 +1,78 @@
+"""
+Revocation filter for stateless access tokens.
+
+With STATELESS_AUTH, a token's claims are trusted without a database
+lookup unless its user might have been deactivated. The filter answers
+that question from memory: a bloom filter holds every inactive user id
+and is rebuilt from the database every REVOCATION_REFRESH_SECONDS, so a
+deactivation takes effect within that interval. A positive answer only
+means "check the database", so bloom false positives cost a query and
+never reject anyone.
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Iterable
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from app.database import engine
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed set of ints with no false negatives and ~1% false positives"""
+    
+    BITS_PER_ITEM = 10
+    HASHES = 7
+    
+    def __init__(self, items: Iterable[int]):
+        items = list(items)
+        self.size = max(64, len(items) * self.BITS_PER_ITEM)
+        self.bits = bytearray((self.size + 7) // 8)
+        for item in items:
+            for bit in self._bits(item):
+                self.bits[bit >> 3] |= 1 << (bit & 7)
+    
+    def _bits(self, item: int):
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return ((first + i * second) % self.size for i in range(self.HASHES))
+    
+    def __contains__(self, item: int) -> bool:
+        return all(self.bits[bit >> 3] & (1 << (bit & 7)) for bit in self._bits(item))
+
+
+class RevocationFilter:
+    def __init__(self):
+        self._bloom = BloomFilter(())
+        self._loaded = False
+    
+    def might_be_revoked(self, user_id: int) -> bool:
+        """False only when the user is known to be active"""
+        if not self._loaded:
+            return True
+        return user_id in self._bloom
+    
+    def refresh(self) -> int:
+        """Rebuild the bloom filter from the database; returns inactive users seen"""
+        with engine.connect() as conn:
+            inactive = conn.execute(select(User.id).where(User.is_active == False)).scalars().all()
+        # A single assignment, so readers see the old filter or the new one
+        self._bloom = BloomFilter(inactive)
+        self._loaded = True
+        return len(inactive)
+
+
+revocations = RevocationFilter()
+
+
+async def refresh_revocations_forever(interval: float) -> None:
+    """Rebuild the filter now and every ``interval`` seconds; run as a lifespan task"""
+    while True:
+        try:
+            await run_in_threadpool(revocations.refresh)
+        except Exception:
+            logger.exception("Refreshing the revocation filter failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,107 @@
+"""
+Write-behind buffers for hot, low-value column updates.
+
+Values such as users.last_login change on every request that touches them
+but nobody needs them to the second. Instead of a write transaction per
+request, callers record the new value in a buffer, which keeps only the
+latest value per row. flush_forever() writes all buffered rows with one
+batched UPDATE per buffer every few seconds, and the app flushes once more
+on shutdown. A worker that crashes loses at most one interval of updates.
+"""
+import asyncio
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import Table, bindparam, update
+from starlette.concurrency import run_in_threadpool
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Pending column values for rows of one table, keyed by primary key"""
+    
+    def __init__(self, table: Table, on_flush: Optional[Callable[[List[int]], None]] = None):
+        self.table = table
+        self.on_flush = on_flush
+        self._pending: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+    
+    def set(self, row_id: int, **values) -> None:
+        """Record new column values; later calls for the same row win"""
+        with self._lock:
+            self._pending.setdefault(row_id, {}).update(values)
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def flush(self) -> int:
+        """Write every pending row; returns the number of rows written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        
+        # One executemany per set of columns, usually just one
+        groups: Dict[tuple, List[dict]] = {}
+        for row_id, values in pending.items():
+            params = {f"new_{column}": value for column, value in values.items()}
+            params["row_id"] = row_id
+            groups.setdefault(tuple(sorted(values)), []).append(params)
+        
+        try:
+            with engine.begin() as conn:
+                for columns, params in groups.items():
+                    conn.execute(
+                        update(self.table)
+                        .where(self.table.c.id == bindparam("row_id"))
+                        .values({column: bindparam(f"new_{column}") for column in columns})
+                        .values(self._unchanged(columns)),
+                        params
+                    )
+        except Exception:
+            # Put the values back unless a newer one arrived meanwhile
+            with self._lock:
+                for row_id, values in pending.items():
+                    self._pending[row_id] = {**values, **self._pending.get(row_id, {})}
+            raise
+        
+        if self.on_flush:
+            self.on_flush(list(pending))
+        return len(pending)
+    
+    
+    def _unchanged(self, columns) -> dict:
+        """Pin onupdate columns such as updated_at: buffered values are not edits"""
+        return {
+            column.name: column
+            for column in self.table.columns
+            if column.onupdate is not None and column.name not in columns
+        }
+
+buffers: List[WriteBehindBuffer] = []
+
+
+def write_behind(table: Table, on_flush: Optional[Callable[[List[int]], None]] = None) -> WriteBehindBuffer:
+    """Create a buffer that flush_all() writes out"""
+    buffer = WriteBehindBuffer(table, on_flush)
+    buffers.append(buffer)
+    return buffer
+
+
+def flush_all() -> int:
+    flushed = 0
+    for buffer in buffers:
+        try:
+            flushed += buffer.flush()
+        except Exception:
+            logger.exception("Flushing buffered %s updates failed", buffer.table.name)
+    return flushed
+
+
+async def flush_forever(interval: float) -> None:
+    """Flush every buffer every ``interval`` seconds; run as a lifespan task"""
+    while True:
+        await asyncio.sleep(interval)
+        await run_in_threadpool(flush_all)
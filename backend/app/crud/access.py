@@ -0,0 +1,56 @@
+from typing import Dict, FrozenSet, Iterable, Set
+from fastapi import HTTPException, status
+from sqlalchemy import select, union
+from sqlalchemy.orm import Session
+from app.models.project import Project, ProjectMember
+from app.core.cache import cache, invalidate
+from app.config import settings
+
+# Ids of the projects each user owns or is a member of, keyed by user id
+access_cache = cache("access", ttl=settings.ACCESS_CACHE_TTL_SECONDS)
+
+
+def accessible_project_ids(db: Session, user_id: int) -> FrozenSet[int]:
+    """Projects the user owns or is a member of, loaded with one query"""
+    def load():
+        owned = select(Project.id).where(Project.owner_id == user_id)
+        member_of = select(ProjectMember.project_id).where(ProjectMember.user_id == user_id)
+        return frozenset(db.execute(union(owned, member_of)).scalars())
+    
+    return access_cache.get_or_load(user_id, load)
+
+
+def can_access_project(db: Session, user_id: int, project_id: int) -> bool:
+    return project_id in accessible_project_ids(db, user_id)
+
+
+def require_project_access(db: Session, user_id: int, project_id: int, detail: str) -> None:
+    if not can_access_project(db, user_id, project_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail
+        )
+
+
+def project_members(db: Session, project_ids: Iterable[int]) -> Dict[int, Set[int]]:
+    """Owner and member ids of each project"""
+    project_ids = set(project_ids)
+    members: Dict[int, Set[int]] = {project_id: set() for project_id in project_ids}
+    if not project_ids:
+        return members
+    
+    rows = db.execute(
+        union(
+            select(Project.id, Project.owner_id).where(Project.id.in_(project_ids)),
+            select(ProjectMember.project_id, ProjectMember.user_id)
+            .where(ProjectMember.project_id.in_(project_ids)),
+        )
+    )
+    for project_id, user_id in rows:
+        members[project_id].add(user_id)
+    return members
+
+
+def invalidate_access(*user_ids: int) -> None:
+    """Call after committing a change to project ownership or membership"""
+    invalidate(*(access_cache.key(user_id) for user_id in user_ids))
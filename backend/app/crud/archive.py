@@ -0,0 +1,194 @@
+"""
+Moves old rows from the hot tables into the archive tables.
+
+Each batch copies its rows with INSERT ... SELECT, deletes the originals
+and commits, so the job holds locks briefly and can be stopped and rerun
+at any point. Archived tasks leave tombstones behind so delta sync drops
+them from clients.
+"""
+from datetime import datetime
+from typing import Iterable, List, Optional
+from sqlalchemy import DateTime, delete, insert, literal, or_, select
+from sqlalchemy.orm import Session, aliased, undefer
+from app.models.user import User
+from app.models.task import Task, task_tags
+from app.models.project import Project
+from app.models.ai_chat import AIConversation, AIMessage, AITaskSuggestion
+from app.models.archive import (
+    ArchivedConversation,
+    ArchivedMessage,
+    ArchivedSuggestion,
+    ArchivedTask,
+    archived_task_tags,
+)
+from app.models.enums import TaskStatus
+from app.crud.changes import next_change_seq, record_tombstones
+from app.crud.dashboard import invalidate_dashboards
+from app.crud.projects import invalidate_project_lists
+from app.crud.conversations import invalidate_conversation_summaries
+from app.crud.tasks import TASK_FIELDS, tag_names_subquery, task_audiences
+from app.core.events import hub
+
+ARCHIVED_TASK_FIELDS = TASK_FIELDS + ("archived_at",)
+
+
+def _copy(db: Session, target, source, *criteria, **extra) -> None:
+    """INSERT INTO target SELECT the matching columns of source
+    
+    ``extra`` gives constant values for target columns source lacks.
+    """
+    names = [column.name for column in target.columns if column.name not in extra]
+    db.execute(
+        insert(target).from_select(
+            names + list(extra),
+            select(
+                *(source.c[name] for name in names),
+                *(literal(value, DateTime) for value in extra.values())
+            ).where(*criteria)
+        )
+    )
+
+
+def archivable_tasks_filter(cutoff: datetime):
+    """Tasks completed before the cutoff that no AI suggestion points at"""
+    return (
+        (Task.status == TaskStatus.COMPLETED)
+        & (Task.completed_at < cutoff)
+        & ~select(AITaskSuggestion.id).where(AITaskSuggestion.created_task_id == Task.id).exists()
+    )
+
+
+def archive_tasks_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Move up to ``batch_size`` archivable tasks and their tags; returns how many moved"""
+    tasks = db.execute(
+        select(Task.id, Task.project_id, Task.created_by_id, Task.assignee_id)
+        .where(archivable_tasks_filter(cutoff))
+        .order_by(Task.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not tasks:
+        return 0
+    
+    task_ids = [task.id for task in tasks]
+    audiences = task_audiences(db, tasks)
+    
+    _copy(db, ArchivedTask.__table__, Task.__table__, Task.id.in_(task_ids), archived_at=datetime.utcnow())
+    _copy(db, archived_task_tags, task_tags, task_tags.c.task_id.in_(task_ids))
+    db.execute(delete(task_tags).where(task_tags.c.task_id.in_(task_ids)))
+    db.execute(delete(Task).where(Task.id.in_(task_ids)))
+    
+    # Archived tasks disappear from every list, like deleted ones
+    change_seq = next_change_seq(db)
+    record_tombstones(db, audiences, {}, change_seq)
+    db.commit()
+    
+    audience = set().union(*audiences.values())
+    invalidate_dashboards(audience)
+    invalidate_project_lists(audience)
+    hub.publish("tasks.archived", audience, count=len(task_ids), cursor=change_seq)
+    return len(task_ids)
+
+
+def stale_conversations_filter(cutoff: datetime):
+    """Conversations neither updated nor written to since the cutoff"""
+    return (
+        (AIConversation.updated_at < cutoff)
+        & ~select(AIMessage.id).where(
+            AIMessage.conversation_id == AIConversation.id,
+            AIMessage.created_at >= cutoff
+        ).exists()
+    )
+
+
+def archive_conversations_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Move up to ``batch_size`` stale conversations with their messages and suggestions"""
+    conversation_ids = db.execute(
+        select(AIConversation.id)
+        .where(stale_conversations_filter(cutoff))
+        .order_by(AIConversation.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not conversation_ids:
+        return 0
+    
+    user_ids = db.execute(
+        select(AIConversation.user_id).where(AIConversation.id.in_(conversation_ids)).distinct()
+    ).scalars().all()
+    message_ids = select(AIMessage.id).where(AIMessage.conversation_id.in_(conversation_ids))
+    
+    _copy(
+        db, ArchivedConversation.__table__, AIConversation.__table__,
+        AIConversation.id.in_(conversation_ids), archived_at=datetime.utcnow()
+    )
+    _copy(db, ArchivedMessage.__table__, AIMessage.__table__, AIMessage.conversation_id.in_(conversation_ids))
+    _copy(db, ArchivedSuggestion.__table__, AITaskSuggestion.__table__, AITaskSuggestion.message_id.in_(message_ids))
+    db.execute(delete(AITaskSuggestion).where(AITaskSuggestion.message_id.in_(message_ids)))
+    db.execute(delete(AIMessage).where(AIMessage.conversation_id.in_(conversation_ids)))
+    db.execute(delete(AIConversation).where(AIConversation.id.in_(conversation_ids)))
+    db.commit()
+    invalidate_conversation_summaries(user_ids)
+    return len(conversation_ids)
+
+
+def archived_tasks_filter(user_id: int, project_ids: Iterable[int]):
+    """Archived tasks the user created, was assigned or can see through a project"""
+    return or_(
+        ArchivedTask.assignee_id == user_id,
+        ArchivedTask.created_by_id == user_id,
+        ArchivedTask.project_id.in_(project_ids),
+    )
+
+
+def archived_task_query(db: Session, *criteria):
+    """Select ARCHIVED_TASK_FIELDS for fetch_task_dicts, newest archive first"""
+    assignee = aliased(User)
+    columns = {
+        "project_name": Project.name,
+        "assignee_name": assignee.name,
+        "tags": tag_names_subquery(db, archived_task_tags, ArchivedTask.id),
+    }
+    return (
+        select(*(
+            columns[field] if field in columns else getattr(ArchivedTask, field)
+            for field in ARCHIVED_TASK_FIELDS
+        ))
+        .select_from(ArchivedTask)
+        .outerjoin(Project, Project.id == ArchivedTask.project_id)
+        .outerjoin(assignee, assignee.id == ArchivedTask.assignee_id)
+        .where(*criteria)
+        .order_by(ArchivedTask.id.desc())
+    )
+
+
+def archived_conversation(db: Session, user_id: int, conversation_id: int) -> Optional[ArchivedConversation]:
+    return db.query(ArchivedConversation).filter(
+        ArchivedConversation.id == conversation_id,
+        ArchivedConversation.user_id == user_id
+    ).first()
+
+
+def archived_messages(db: Session, conversation_id: int) -> List[dict]:
+    """Messages of an archived conversation with their suggestions, two queries in all"""
+    messages = db.query(ArchivedMessage).filter(
+        ArchivedMessage.conversation_id == conversation_id
+    ).options(undefer(ArchivedMessage.content_blob)).order_by(ArchivedMessage.created_at, ArchivedMessage.id).all()
+    
+    suggestions = {}
+    if messages:
+        for suggestion in db.query(ArchivedSuggestion).filter(
+            ArchivedSuggestion.message_id.in_([message.id for message in messages])
+        ).order_by(ArchivedSuggestion.id):
+            suggestions.setdefault(suggestion.message_id, []).append(suggestion)
+    
+    return [
+        {
+            "id": message.id,
+            "role": message.role,
+            "content": message.content,
+            "created_at": message.created_at,
+            "task_suggestions": suggestions.get(message.id, []),
+        }
+        for message in messages
+    ]
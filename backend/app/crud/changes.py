@@ -0,0 +1,69 @@
+from typing import Dict, List, Set
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models.sync import ChangeSequence, TaskTombstone
+from app.models.task import Task
+
+
+def next_change_seq(db: Session) -> int:
+    """Allocate the next change sequence number for the current transaction
+    
+    The counter row stays write-locked until the transaction ends, so
+    sequence numbers become visible in the same order they are handed out
+    and a reader never sees seq N committed before seq N-1. Allocate as late
+    as possible and commit soon after.
+    """
+    db.execute(
+        update(ChangeSequence)
+        .where(ChangeSequence.id == 1)
+        .values(value=ChangeSequence.value + 1)
+    )
+    return db.execute(select(ChangeSequence.value).where(ChangeSequence.id == 1)).scalar_one()
+
+
+def touch_tasks(db: Session, *criteria) -> int:
+    """Give matching tasks a new change sequence number; the caller commits
+    
+    For changes that alter how tasks serialize without editing them, such
+    as a project or assignee rename, so delta sync clients refetch them.
+    updated_at is left as it is.
+    """
+    return db.execute(
+        update(Task)
+        .where(*criteria)
+        .values(change_seq=next_change_seq(db), updated_at=Task.updated_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def current_change_seq(db: Session) -> int:
+    """Latest committed change sequence number"""
+    return db.execute(select(ChangeSequence.value).where(ChangeSequence.id == 1)).scalar() or 0
+
+
+def record_tombstones(
+    db: Session,
+    audiences_before: Dict[int, Set[int]],
+    audiences_after: Dict[int, Set[int]],
+    change_seq: int,
+) -> int:
+    """Add a tombstone for every user who could see a task before but not after"""
+    tombstones = [
+        TaskTombstone(task_id=task_id, user_id=user_id, change_seq=change_seq)
+        for task_id, users_before in audiences_before.items()
+        for user_id in users_before - audiences_after.get(task_id, set())
+    ]
+    db.add_all(tombstones)
+    return len(tombstones)
+
+
+def removed_task_ids(db: Session, user_id: int, since: int, until: int) -> List[int]:
+    """Tasks that left the user's visibility in the (since, until] window"""
+    rows = db.execute(
+        select(TaskTombstone.task_id).where(
+            TaskTombstone.user_id == user_id,
+            TaskTombstone.change_seq > since,
+            TaskTombstone.change_seq <= until,
+        ).distinct()
+    )
+    return [row[0] for row in rows]
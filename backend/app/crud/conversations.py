@@ -0,0 +1,57 @@
+from typing import Iterable, List
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.ai_chat import AIConversation, AIMessage
+from app.core.cache import invalidate
+from app.core.compression import PREVIEW_LENGTH
+
+# Cached conversation summary responses, keyed by user id
+CONVERSATION_SUMMARY_CACHE = "conversation_summaries"
+
+
+def conversation_summaries(db: Session, user_id: int) -> List[dict]:
+    """A user's conversations with message counts and the last message's preview
+    
+    Reads only the preview column, never the compressed message bodies.
+    """
+    counts = (
+        select(AIMessage.conversation_id, func.count(AIMessage.id).label("message_count"))
+        .group_by(AIMessage.conversation_id)
+        .subquery()
+    )
+    last_message = (
+        select(AIMessage.preview)
+        .where(AIMessage.conversation_id == AIConversation.id)
+        .order_by(AIMessage.created_at.desc(), AIMessage.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        select(
+            AIConversation.id,
+            AIConversation.title,
+            AIConversation.created_at,
+            AIConversation.updated_at,
+            func.coalesce(counts.c.message_count, 0),
+            last_message,
+        )
+        .outerjoin(counts, counts.c.conversation_id == AIConversation.id)
+        .where(AIConversation.user_id == user_id)
+        .order_by(AIConversation.updated_at.desc())
+    )
+    return [
+        {
+            "id": conversation_id,
+            "title": title,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "message_count": message_count,
+            "last_message": preview[:PREVIEW_LENGTH] if preview is not None else None,
+        }
+        for conversation_id, title, created_at, updated_at, message_count, preview in rows
+    ]
+
+
+def invalidate_conversation_summaries(user_ids: Iterable[int]) -> None:
+    """Call after committing a change to these users' conversations or messages"""
+    invalidate(*(f"{CONVERSATION_SUMMARY_CACHE}:{user_id}" for user_id in user_ids))
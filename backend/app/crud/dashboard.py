@@ -0,0 +1,89 @@
+from datetime import date
+from typing import Any, Callable, Iterable
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.models.project import Project
+from app.models.enums import Priority, TaskStatus
+from app.core.cache import cache, invalidate
+from app.config import settings
+
+# (day, summary) pairs keyed by user id
+dashboard_cache = cache("dashboard", ttl=settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+
+def dashboard_summary(db: Session, *criteria) -> dict:
+    """Count the matching tasks by status, priority and project in one GROUP BY"""
+    today = date.today()
+    unfinished = Task.status != TaskStatus.COMPLETED
+    rows = db.execute(
+        select(
+            Task.status,
+            Task.priority,
+            Task.project_id,
+            Project.name,
+            func.count(Task.id),
+            func.sum(case((and_(unfinished, Task.due_date == today), 1), else_=0)),
+            func.sum(case((and_(unfinished, Task.due_date < today), 1), else_=0)),
+        )
+        .outerjoin(Project, Project.id == Task.project_id)
+        .where(*criteria)
+        .group_by(Task.status, Task.priority, Task.project_id, Project.name)
+    )
+    
+    summary = {
+        "total_tasks": 0,
+        "due_today": 0,
+        "overdue": 0,
+        "by_status": {status.value: 0 for status in TaskStatus},
+        "by_priority": {priority.value: 0 for priority in Priority},
+        "by_project": [],
+    }
+    projects = {}
+    for status, priority, project_id, project_name, count, due_today, overdue in rows:
+        summary["total_tasks"] += count
+        summary["due_today"] += due_today or 0
+        summary["overdue"] += overdue or 0
+        summary["by_status"][status.value] += count
+        summary["by_priority"][priority.value] += count
+        
+        # Inbox tasks are grouped under project_id None
+        project = projects.setdefault(project_id, {
+            "project_id": project_id,
+            "project_name": project_name,
+            "total_tasks": 0,
+            "completed_tasks": 0,
+        })
+        project["total_tasks"] += count
+        if status == TaskStatus.COMPLETED:
+            project["completed_tasks"] += count
+    
+    summary["by_project"] = sorted(
+        projects.values(), key=lambda project: (project["project_id"] is None, project["project_id"] or 0)
+    )
+    return summary
+
+
+def cached_dashboard_summary(
+    user_id: int, load: Callable[[], dict], refresh: Callable[[], Any]
+) -> dict:
+    """Serve a user's summary from the cache, calling ``load`` on a miss
+    
+    On a miss ``refresh`` runs first, outside the load: it may write tasks
+    and invalidate dashboards, which would discard a summary loading at the
+    same time. Entries from a previous day are reloaded so due-today and
+    overdue counts roll over at midnight.
+    """
+    today = date.today()
+    entry = dashboard_cache.get(user_id)
+    if entry is not None:
+        if entry[0] == today:
+            return entry[1]
+        dashboard_cache.evict(user_id)
+    refresh()
+    return dashboard_cache.get_or_load(user_id, lambda: (today, load()))[1]
+
+
+def invalidate_dashboards(user_ids: Iterable[int]) -> None:
+    """Call after committing a write that changes tasks these users can see"""
+    invalidate(*(dashboard_cache.key(user_id) for user_id in user_ids))
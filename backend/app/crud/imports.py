@@ -0,0 +1,325 @@
+"""
+Bulk task import from CSV or NDJSON files.
+
+Files are parsed row by row and processed in batches: each batch resolves
+its projects, assignees and tags with a handful of IN queries, inserts
+its tasks with one executemany (a multi-row INSERT on Postgres), reads
+their ids back with one SELECT and commits together with the job's
+progress, so a failure part-way keeps every batch committed before it.
+"""
+import csv
+import io
+import logging
+import os
+from datetime import date, datetime
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+import orjson
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.imports import ImportJob
+from app.models.task import Task, task_tags
+from app.models.project import Project
+from app.models.user import User
+from app.models.enums import Priority, TaskStatus
+from app.crud.access import accessible_project_ids
+from app.crud.changes import next_change_seq
+from app.crud.dashboard import invalidate_dashboards
+from app.crud.projects import invalidate_project_lists
+from app.crud.tasks import resolve_tag_ids, task_audiences
+from app.core.events import hub
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Rows validated, inserted and committed together
+IMPORT_BATCH_SIZE = 500
+
+# Row errors kept on the job; error_count still counts every one
+IMPORT_MAX_ERRORS = 1000
+
+PRIORITIES = {key.lower(): priority for priority in Priority for key in (priority.name, priority.value)}
+STATUSES = {key.lower(): status for status in TaskStatus for key in (status.name, status.value)}
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_rows(file: BinaryIO, format: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, row, parse error) without reading the whole file"""
+    if format == "csv":
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        try:
+            for number, row in enumerate(csv.DictReader(text), start=1):
+                yield number, row, None
+        finally:
+            # Leave the binary file open for the caller
+            text.detach()
+        return
+    
+    number = 0
+    for line in file:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield number, None, f"Invalid JSON: {e}"
+            continue
+        if isinstance(row, dict):
+            yield number, row, None
+        else:
+            yield number, None, "Expected a JSON object"
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _text(row: dict, key: str) -> Optional[str]:
+    value = row.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _int(row: dict, key: str) -> Optional[int]:
+    value = _text(row, key)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise RowError(f"{key} must be an integer")
+
+
+def _tags(row: dict) -> List[str]:
+    value = row.get("tags")
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    elif not isinstance(value, list):
+        raise RowError("tags must be a list or a comma-separated string")
+    return list(dict.fromkeys(str(tag).strip() for tag in value if str(tag).strip()))
+
+
+class TaskImporter:
+    """Validates and inserts task rows on behalf of one user"""
+    
+    def __init__(self, db: Session, user_id: int):
+        self.db = db
+        self.user_id = user_id
+        self.project_ids = accessible_project_ids(db, user_id)
+        self._projects_by_name: Optional[Dict[str, int]] = None
+        self._users_by_email: Dict[str, Optional[int]] = {}
+        self._user_ids: Dict[int, bool] = {}
+    
+    def import_batch(self, rows: List[Tuple[int, Optional[dict], Optional[str]]]):
+        """Insert the valid rows of a batch; returns (inserted tasks, errors)
+        
+        Inserted tasks are rows with id, project_id, created_by_id and
+        assignee_id. The caller commits.
+        """
+        self._prefetch_users([row for _, row, _ in rows if row is not None])
+        
+        values, tag_names, errors = [], [], []
+        for number, row, error in rows:
+            if error is None:
+                try:
+                    task, tags = self._validate(row)
+                    values.append(task)
+                    tag_names.append(tags)
+                    continue
+                except RowError as e:
+                    error = str(e)
+            errors.append({"row": number, "error": error})
+        
+        if not values:
+            return [], errors
+        
+        change_seq = next_change_seq(self.db)
+        for task in values:
+            task["change_seq"] = change_seq
+        self.db.execute(insert(Task), values)
+        
+        # No RETURNING: ordered RETURNING makes SQLite insert row by row.
+        # The change sequence is this transaction's alone and ids are
+        # assigned in insertion order, so this reads the rows back in the
+        # order of ``values``
+        inserted = self.db.execute(
+            select(Task.id, Task.project_id, Task.created_by_id, Task.assignee_id)
+            .where(Task.change_seq == change_seq)
+            .order_by(Task.id)
+        ).all()
+        
+        tag_ids = resolve_tag_ids(self.db, (name for names in tag_names for name in names))
+        tag_rows = [
+            {"task_id": task.id, "tag_id": tag_ids[name]}
+            for task, names in zip(inserted, tag_names)
+            for name in names
+        ]
+        if tag_rows:
+            self.db.execute(insert(task_tags), tag_rows)
+        
+        return inserted, errors
+    
+    def _validate(self, row: dict) -> Tuple[dict, List[str]]:
+        title = _text(row, "title")
+        if not title:
+            raise RowError("title is required")
+        
+        priority = PRIORITIES.get((_text(row, "priority") or "medium").lower())
+        if priority is None:
+            raise RowError(f"Unknown priority: {row.get('priority')}")
+        
+        status = STATUSES.get((_text(row, "status") or "open").lower())
+        if status is None:
+            raise RowError(f"Unknown status: {row.get('status')}")
+        
+        due_date = _text(row, "due_date")
+        if due_date:
+            try:
+                due_date = date.fromisoformat(due_date[:10])
+            except ValueError:
+                raise RowError("due_date must be YYYY-MM-DD")
+        
+        project_id = self._project_id(row)
+        assignee_id = self._assignee_id(row)
+        
+        return {
+            "title": title,
+            "description": _text(row, "description"),
+            "priority": priority,
+            "status": status,
+            "due_date": due_date,
+            "project_id": project_id,
+            "assignee_id": assignee_id,
+            "created_by_id": self.user_id,
+            "is_inbox": project_id is None,
+            "completed_at": datetime.utcnow() if status == TaskStatus.COMPLETED else None,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }, _tags(row)
+    
+    def _project_id(self, row: dict) -> Optional[int]:
+        project_id = _int(row, "project_id")
+        if project_id is not None:
+            if project_id not in self.project_ids:
+                raise RowError(f"No access to project {project_id}")
+            return project_id
+        
+        name = _text(row, "project_name")
+        if name is None:
+            return None
+        if self._projects_by_name is None:
+            # Names of every accessible project, loaded once per import
+            self._projects_by_name = {}
+            for project_id, project_name in self.db.execute(
+                select(Project.id, Project.name)
+                .where(Project.id.in_(self.project_ids))
+                .order_by(Project.id.desc())
+            ):
+                self._projects_by_name[project_name.lower()] = project_id
+        if name.lower() not in self._projects_by_name:
+            raise RowError(f"Unknown project: {name}")
+        return self._projects_by_name[name.lower()]
+    
+    def _assignee_id(self, row: dict) -> int:
+        assignee_id = _int(row, "assignee_id")
+        if assignee_id is not None:
+            if not self._user_ids.get(assignee_id):
+                raise RowError(f"Unknown assignee {assignee_id}")
+            return assignee_id
+        
+        email = _text(row, "assignee_email")
+        if email is None:
+            return self.user_id
+        assignee_id = self._users_by_email.get(email.lower())
+        if assignee_id is None:
+            raise RowError(f"Unknown assignee: {email}")
+        return assignee_id
+    
+    def _prefetch_users(self, rows: List[dict]) -> None:
+        # One query per batch for every assignee not seen in earlier batches
+        emails, user_ids = set(), set()
+        for row in rows:
+            email = _text(row, "assignee_email")
+            if email and email.lower() not in self._users_by_email:
+                emails.add(email.lower())
+            try:
+                user_id = _int(row, "assignee_id")
+            except RowError:
+                continue
+            if user_id is not None and user_id not in self._user_ids:
+                user_ids.add(user_id)
+        
+        if not emails and not user_ids:
+            return
+        self._users_by_email.update(dict.fromkeys(emails))
+        self._user_ids.update(dict.fromkeys(user_ids, False))
+        for user_id, email in self.db.execute(
+            select(User.id, User.email).where(
+                User.is_active == True,
+                (User.id.in_(user_ids)) | (func.lower(User.email).in_(emails))
+            )
+        ):
+            self._users_by_email[email.lower()] = user_id
+            self._user_ids[user_id] = True
+
+
+def run_task_import(job_id: int, path: str) -> None:
+    """Process an uploaded file for an ImportJob, then delete the file"""
+    db = SessionLocal()
+    try:
+        job = db.get(ImportJob, job_id)
+        job.status = "running"
+        db.commit()
+        
+        importer = TaskImporter(db, job.user_id)
+        with open(path, "rb") as file:
+            for batch in batched(read_rows(file, job.format), IMPORT_BATCH_SIZE):
+                inserted, errors = importer.import_batch(batch)
+                
+                job.processed_rows += len(batch)
+                job.processed_bytes = min(file.tell(), job.total_bytes)
+                job.created_count += len(inserted)
+                job.error_count += len(errors)
+                if errors and len(job.errors) < IMPORT_MAX_ERRORS:
+                    job.errors = job.errors + errors[:IMPORT_MAX_ERRORS - len(job.errors)]
+                db.commit()
+                
+                if inserted:
+                    _notify(db, job, inserted)
+        
+        job.status = "completed"
+        job.processed_bytes = job.total_bytes
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        logger.exception("Import job %s failed", job_id)
+        db.rollback()
+        job = db.get(ImportJob, job_id)
+        if job is not None:
+            job.status = "failed"
+            job.errors = job.errors + [{"row": None, "error": str(e)}]
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+        os.remove(path)
+
+
+def _notify(db: Session, job: ImportJob, inserted) -> None:
+    # One compact event per batch; clients fetch the tasks through delta sync
+    audience = set().union(*task_audiences(db, inserted).values())
+    invalidate_dashboards(audience)
+    invalidate_project_lists(audience)
+    hub.publish("tasks.imported", audience, import_job_id=job.id, count=len(inserted))
@@ -0,0 +1,84 @@
+"""
+Monthly partitions of ai_messages and ai_task_suggestions on Postgres.
+
+The add_ai_message_partitions migration range-partitions both tables by
+month of created_at. Each table also has a DEFAULT partition for rows
+outside every month. Months must be created before their first rows
+arrive, because a month whose rows already sit in the default partition
+can no longer be attached. scripts/maintain_partitions.py therefore
+creates the coming months ahead of time, and it can detach old months,
+which leaves them as plain tables to dump or drop.
+"""
+import re
+from datetime import date, datetime
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PARTITIONED_TABLES = ("ai_messages", "ai_task_suggestions")
+
+PARTITION_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    return conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    ).scalar()
+
+
+def month_partitions(conn: Connection, table: str) -> List[tuple]:
+    """(month, partition name) of every monthly partition, oldest first"""
+    names = conn.execute(
+        text("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(:table)
+        """),
+        {"table": table}
+    ).scalars()
+    partitions = []
+    for name in names:
+        match = PARTITION_SUFFIX.search(name)
+        if match:
+            partitions.append((date(int(match[1]), int(match[2]), 1), name))
+    return sorted(partitions)
+
+
+def create_partitions(conn: Connection, months_ahead: int) -> List[str]:
+    """Create any missing partitions from this month to ``months_ahead`` months out"""
+    this_month = datetime.utcnow().date().replace(day=1)
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = {month for month, _ in month_partitions(conn, table)}
+        for offset in range(months_ahead + 1):
+            month = add_months(this_month, offset)
+            if month in existing:
+                continue
+            name = partition_name(table, month)
+            conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            ))
+            created.append(name)
+    return created
+
+
+def detach_partitions(conn: Connection, before: date) -> List[str]:
+    """Detach the monthly partitions that end on or before ``before``"""
+    detached = []
+    for table in PARTITIONED_TABLES:
+        for month, name in month_partitions(conn, table):
+            if add_months(month, 1) <= before:
+                conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                detached.append(name)
+    return detached
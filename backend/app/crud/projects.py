@@ -0,0 +1,109 @@
+from typing import Iterable, List, Set
+from sqlalchemy import func, select, case
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.models.project import Project
+from app.models.enums import TaskStatus
+from app.crud.access import project_members
+from app.core.cache import invalidate
+
+# Cached project list bodies, keyed by (user id, fields, list version ETag)
+PROJECT_LIST_CACHE = "project_list"
+
+# Keys of a serialized project, in ProjectResponse field order
+PROJECT_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "status",
+    "progress",
+    "due_date",
+    "owner_id",
+    "total_tasks",
+    "completed_tasks",
+    "created_at",
+    "updated_at",
+)
+
+# Fields that need the per-project task counts
+TASK_COUNT_FIELDS = {"progress", "total_tasks", "completed_tasks"}
+
+
+def visible_projects_filter(project_ids: Iterable[int]):
+    """Projects in the user's accessible_project_ids()"""
+    return Project.id.in_(project_ids)
+
+
+def project_audience(db: Session, project: Project) -> Set[int]:
+    """Owner and members of a project"""
+    return project_members(db, [project.id])[project.id]
+
+
+def project_list_query(*criteria, fields=PROJECT_FIELDS):
+    """Select the requested ProjectResponse columns as plain tuples
+    
+    Task counts come from one GROUP BY over the matching projects' tasks and
+    are only computed when a count or progress field is requested.
+    """
+    columns = [
+        getattr(Project, field) for field in fields
+        if field not in TASK_COUNT_FIELDS
+    ]
+    query = select(*columns)
+    
+    if TASK_COUNT_FIELDS & set(fields):
+        matching_projects = select(Project.id).where(*criteria)
+        counts = select(
+            Task.project_id,
+            func.count(Task.id).label("total_tasks"),
+            func.sum(case((Task.status == TaskStatus.COMPLETED, 1), else_=0)).label("completed_tasks"),
+        ).where(
+            Task.project_id.in_(matching_projects)
+        ).group_by(Task.project_id).subquery()
+        
+        query = query.add_columns(
+            func.coalesce(counts.c.total_tasks, 0),
+            func.coalesce(counts.c.completed_tasks, 0),
+        ).outerjoin(counts, counts.c.project_id == Project.id)
+    
+    return query.select_from(Project).where(*criteria)
+
+
+def project_list_version(db: Session, *criteria) -> tuple:
+    """Cheap change markers for a project list, computed without loading rows
+    
+    Covers the projects themselves and their tasks, since task changes move
+    the counts and progress.
+    """
+    matching_projects = select(Project.id).where(*criteria)
+    project_version = db.execute(
+        select(func.count(Project.id), func.sum(Project.id), func.max(Project.updated_at)).where(*criteria)
+    ).one()
+    task_version = db.execute(
+        select(func.count(Task.id), func.max(Task.updated_at)).where(
+            Task.project_id.in_(matching_projects)
+        )
+    ).one()
+    return (*project_version, *task_version)
+
+
+def fetch_project_dicts(db: Session, query, fields=PROJECT_FIELDS) -> List[dict]:
+    """Run a project_list_query and return JSON-ready dicts"""
+    with_counts = bool(TASK_COUNT_FIELDS & set(fields))
+    column_fields = [field for field in fields if field not in TASK_COUNT_FIELDS]
+    
+    projects = []
+    for row in db.execute(query):
+        values = dict(zip(column_fields, row))
+        if with_counts:
+            total_tasks, completed_tasks = row[-2], row[-1]
+            values["total_tasks"] = total_tasks
+            values["completed_tasks"] = completed_tasks
+            values["progress"] = int((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0)
+        projects.append({field: values[field] for field in fields})
+    return projects
+
+
+def invalidate_project_lists(user_ids: Iterable[int]) -> None:
+    """Call after committing a write that changes projects or task counts these users can see"""
+    invalidate(*(f"{PROJECT_LIST_CACHE}:{user_id}" for user_id in user_ids))
@@ -0,0 +1,134 @@
+"""
+Rotating refresh tokens.
+
+A refresh token is 32 random bytes, so a keyed SHA-256 of it is as safe to
+store as a bcrypt hash of a password and costs microseconds to check. Only
+that HMAC is kept. Every refresh marks the presented token used and issues
+the next one in its family; a used token presented again revokes the family,
+which logs out both the thief and the victim. Used tokens expire after
+REFRESH_TOKEN_REPLAY_WINDOW_MINUTES and are purged, so a session keeps only
+its current token and the few it replaced within that window.
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import engine
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL_SECONDS = 3600
+
+# How long a used token is kept to catch its replay; the purge then drops it
+REPLAY_WINDOW = timedelta(minutes=settings.REFRESH_TOKEN_REPLAY_WINDOW_MINUTES)
+
+
+def hash_refresh_token(token: str) -> bytes:
+    return hmac.new(settings.SECRET_KEY.encode(), token.encode(), hashlib.sha256).digest()
+
+
+def new_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def refresh_token_row(token: str, user_id: int, family: Optional[str] = None) -> dict:
+    return {
+        "user_id": user_id,
+        "token_hash": hash_refresh_token(token),
+        "family": family or secrets.token_hex(16),
+        "expires_at": datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    }
+
+
+def issue_refresh_token(db: Session, user_id: int, family: Optional[str] = None) -> str:
+    """Add a new refresh token for the user; the caller commits"""
+    token = new_refresh_token()
+    db.add(RefreshToken(**refresh_token_row(token, user_id, family)))
+    return token
+
+
+def store_refresh_token(token: str, user_id: int) -> None:
+    """Insert a new token family in its own transaction; run as a background task"""
+    with engine.begin() as conn:
+        conn.execute(insert(RefreshToken).values(**refresh_token_row(token, user_id)))
+
+
+def rotate_refresh_token(db: Session, token: str) -> Optional[Tuple[int, str]]:
+    """Use up a refresh token and issue its successor
+    
+    Returns (user id, new token), or None when the token is unknown,
+    expired or already used, or its user is inactive. Commits either way.
+    """
+    # is_active comes from the database, never the user cache, so a
+    # deactivated user cannot keep refreshing until the cache expires
+    row = db.execute(
+        select(RefreshToken.id, RefreshToken.user_id, RefreshToken.family,
+               RefreshToken.expires_at, User.is_active)
+        .join(User, User.id == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
+    ).first()
+    now = datetime.utcnow()
+    if row is None or row.expires_at <= now:
+        return None
+    if not row.is_active:
+        revoke_refresh_tokens(db, user_id=row.user_id)
+        db.commit()
+        return None
+    
+    # The conditional update makes concurrent refreshes with one token race
+    # for it; the loser is treated as a replay
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.used_at.is_(None))
+        .values(used_at=now, expires_at=min(row.expires_at, now + REPLAY_WINDOW))
+    ).rowcount
+    if not claimed:
+        logger.warning("Refresh token reused; revoking its family for user %s", row.user_id)
+        revoke_refresh_tokens(db, family=row.family)
+        db.commit()
+        return None
+    
+    user_id = row.user_id
+    new_token = issue_refresh_token(db, user_id, row.family)
+    db.commit()
+    return user_id, new_token
+
+
+def revoke_refresh_tokens(db: Session, user_id: Optional[int] = None, family: Optional[str] = None) -> None:
+    """Delete a user's or a family's refresh tokens; the caller commits"""
+    if user_id is None and family is None:
+        raise ValueError("Pass a user_id or a family")
+    statement = delete(RefreshToken)
+    if user_id is not None:
+        statement = statement.where(RefreshToken.user_id == user_id)
+    if family is not None:
+        statement = statement.where(RefreshToken.family == family)
+    db.execute(statement)
+
+
+def purge_expired_refresh_tokens() -> int:
+    with engine.begin() as conn:
+        return conn.execute(
+            delete(RefreshToken).where(RefreshToken.expires_at <= datetime.utcnow())
+        ).rowcount
+
+
+async def purge_expired_refresh_tokens_forever(interval: float = PURGE_INTERVAL_SECONDS) -> None:
+    """Delete expired refresh tokens every ``interval`` seconds; run as a lifespan task"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            purged = await run_in_threadpool(purge_expired_refresh_tokens)
+            if purged:
+                logger.info("Purged %s expired refresh tokens", purged)
+        except Exception:
+            logger.exception("Purging refresh tokens failed")
@@ -0,0 +1,48 @@
+import re
+from typing import List
+from sqlalchemy import column, func, literal_column, select, table
+from sqlalchemy.orm import Session
+from app.models.task import Task
+
+# SQLite FTS5 index maintained by the triggers in app.models.search
+tasks_fts = table("tasks_fts", column("rowid"))
+
+# Title matches outrank description matches, which outrank tag matches
+FTS_COLUMN_WEIGHTS = (10.0, 5.0, 2.0)
+
+SEARCH_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(q: str) -> List[str]:
+    """Split a query into plain words, dropping any search operators"""
+    return SEARCH_TERM.findall(q.lower())
+
+
+def task_search_matches(db: Session, q: str):
+    """Subquery of (task_id, rank) for tasks matching every term of ``q``
+    
+    Each term also matches as a prefix. Lower ranks are better. Returns
+    None when ``q`` has no searchable words.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return None
+    
+    if db.get_bind().dialect.name == "postgresql":
+        query = func.to_tsquery("english", " & ".join(f"{term}:*" for term in terms))
+        search_vector = literal_column("tasks.search_vector")
+        return (
+            select(Task.id.label("task_id"), (-func.ts_rank_cd(search_vector, query)).label("rank"))
+            .where(search_vector.op("@@")(query))
+            .subquery()
+        )
+    
+    match = " ".join(f'"{term}"*' for term in terms)
+    return (
+        select(
+            tasks_fts.c.rowid.label("task_id"),
+            func.bm25(literal_column("tasks_fts"), *FTS_COLUMN_WEIGHTS).label("rank"),
+        )
+        .where(literal_column("tasks_fts").op("MATCH")(match))
+        .subquery()
+    )
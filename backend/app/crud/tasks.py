@@ -0,0 +1,307 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import func, insert, select, or_, tuple_
+from sqlalchemy.orm import Session, aliased
+from app.models.user import User
+from app.models.task import TASK_SORT_EXPRESSIONS, Task, Tag, task_tags
+from app.models.project import Project
+from app.models.enums import TaskStatus
+from app.crud.access import project_members
+from app.crud.changes import next_change_seq
+from app.crud.dashboard import invalidate_dashboards
+from app.core.cache import cache
+from app.config import settings
+
+# Separator used when SQLite concatenates tag names (can't appear in a tag)
+TAG_SEPARATOR = "\x1f"
+
+# Keys of a serialized task, in TaskResponse field order
+TASK_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "priority",
+    "due_date",
+    "status",
+    "project_id",
+    "project_name",
+    "assignee_id",
+    "assignee_name",
+    "created_by_id",
+    "is_inbox",
+    "tags",
+    "created_at",
+    "updated_at",
+    "completed_at",
+)
+
+# Tag ids by name; tags are never renamed, so entries only age out
+tag_cache = cache("tag", ttl=settings.TAG_CACHE_TTL_SECONDS)
+
+
+def visible_tasks_filter(user_id: int, project_ids: Iterable[int]):
+    """Tasks the user created, is assigned to, or can see through a project
+    
+    ``project_ids`` is the user's accessible_project_ids().
+    """
+    return or_(
+        Task.assignee_id == user_id,
+        Task.created_by_id == user_id,
+        Task.project_id.in_(project_ids),
+    )
+
+
+def tagged_tasks_filter(tag_name: str):
+    """Tasks carrying the named tag"""
+    return Task.id.in_(
+        select(task_tags.c.task_id)
+        .join(Tag, Tag.id == task_tags.c.tag_id)
+        .where(Tag.name == tag_name)
+    )
+
+
+def task_audiences(db: Session, tasks: Iterable[Task]) -> Dict[int, Set[int]]:
+    """Users who can see each task, mirroring visible_tasks_filter
+    
+    Accepts tasks or rows with id, project_id, created_by_id and assignee_id.
+    """
+    tasks = list(tasks)
+    members = project_members(db, {task.project_id for task in tasks if task.project_id})
+    
+    audiences = {}
+    for task in tasks:
+        audience = {task.created_by_id}
+        if task.assignee_id:
+            audience.add(task.assignee_id)
+        if task.project_id:
+            audience |= members.get(task.project_id, set())
+        audiences[task.id] = audience
+    return audiences
+
+
+def resolve_tag_ids(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """Map tag names to ids, creating missing tags, with one query for cache misses"""
+    tag_ids = {}
+    missing = []
+    for name in dict.fromkeys(names):
+        tag_id = tag_cache.get(name)
+        if tag_id is None:
+            missing.append(name)
+        else:
+            tag_ids[name] = tag_id
+    
+    if missing:
+        for tag_id, name in db.execute(select(Tag.id, Tag.name).where(Tag.name.in_(missing))):
+            tag_ids[name] = tag_id
+            tag_cache.set(name, tag_id)
+        
+        # New tags are cached once committed and looked up again
+        new_tags = [Tag(name=name) for name in missing if name not in tag_ids]
+        if new_tags:
+            db.add_all(new_tags)
+            db.flush()
+            tag_ids.update({tag.name: tag.id for tag in new_tags})
+    
+    return tag_ids
+
+
+def add_task_tags(db: Session, task_id: int, tag_ids: Iterable[int]) -> None:
+    rows = [{"task_id": task_id, "tag_id": tag_id} for tag_id in tag_ids]
+    if rows:
+        db.execute(insert(task_tags), rows)
+
+
+def tag_names_subquery(db: Session, links=task_tags, task_id=Task.id):
+    """Correlated subquery aggregating a task's tag names in SQL
+    
+    ``links`` is the task-tag association table and ``task_id`` the task
+    column it is correlated with.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        aggregate = func.array_agg(Tag.name)
+    else:
+        aggregate = func.group_concat(Tag.name, TAG_SEPARATOR)
+    return (
+        select(aggregate)
+        .select_from(links.join(Tag, Tag.id == links.c.tag_id))
+        .where(links.c.task_id == task_id)
+        .scalar_subquery()
+    )
+
+
+def task_list_query(db: Session, *criteria, fields=TASK_FIELDS):
+    """Select the requested TaskResponse columns as plain tuples
+    
+    Joins for project name, assignee name and tags are only added when
+    those fields are requested.
+    """
+    assignee = aliased(User)
+    columns = {
+        "id": Task.id,
+        "title": Task.title,
+        "description": Task.description,
+        "priority": Task.priority,
+        "due_date": Task.due_date,
+        "status": Task.status,
+        "project_id": Task.project_id,
+        "project_name": Project.name,
+        "assignee_id": Task.assignee_id,
+        "assignee_name": assignee.name,
+        "created_by_id": Task.created_by_id,
+        "is_inbox": Task.is_inbox,
+        "created_at": Task.created_at,
+        "updated_at": Task.updated_at,
+        "completed_at": Task.completed_at,
+    }
+    
+    query = select(*(
+        tag_names_subquery(db) if field == "tags" else columns[field]
+        for field in fields
+    )).select_from(Task)
+    if "project_name" in fields:
+        query = query.outerjoin(Project, Project.id == Task.project_id)
+    if "assignee_name" in fields:
+        query = query.outerjoin(assignee, assignee.id == Task.assignee_id)
+    return query.where(*criteria)
+
+
+def _split_tags(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return value.split(TAG_SEPARATOR)
+    return list(value)
+
+
+def _task_dicts(rows, fields) -> List[dict]:
+    # Extra trailing columns (such as a sort value) are dropped by zip
+    tasks = [dict(zip(fields, row)) for row in rows]
+    if "tags" in fields:
+        for task in tasks:
+            task["tags"] = _split_tags(task["tags"])
+    return tasks
+
+
+def fetch_task_dicts(db: Session, query, fields=TASK_FIELDS) -> List[dict]:
+    """Run a task_list_query and return JSON-ready dicts"""
+    return _task_dicts(db.execute(query), fields)
+
+
+def stream_task_dicts(db: Session, query, fields=TASK_FIELDS, batch_size: int = 1000) -> Iterator[dict]:
+    """Like fetch_task_dicts, but reads rows in batches from a server-side cursor"""
+    result = db.execute(query.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        yield from _task_dicts(rows, fields)
+
+
+def task_sort_expression(sort_key: Optional[str]):
+    """SQL expression behind a sort key; unsorted lists are ordered by id"""
+    return TASK_SORT_EXPRESSIONS[sort_key] if sort_key else Task.id
+
+
+def order_task_query(query, sort_key: Optional[str], descending: bool, after: Optional[tuple] = None):
+    """Order a task_list_query by a sort key with id as the tie-breaker
+    
+    ``after`` is the (sort value, id) position of the last task already
+    returned; only tasks past it are selected, which stays stable while
+    tasks are added or edited between pages.
+    """
+    expression = task_sort_expression(sort_key)
+    position = tuple_(expression, Task.id)
+    if after is not None:
+        query = query.where(position < tuple_(*after) if descending else position > tuple_(*after))
+    if descending:
+        return query.order_by(expression.desc(), Task.id.desc())
+    return query.order_by(expression, Task.id)
+
+
+def fetch_task_page(
+    db: Session, query, fields, sort_key: Optional[str], limit: int
+) -> Tuple[List[dict], Optional[tuple]]:
+    """Run an ordered task query and return a page of dicts
+    
+    Also returns the position to pass as ``after`` for the next page, or
+    None when this is the last one.
+    """
+    rows = db.execute(query.add_columns(task_sort_expression(sort_key)).limit(limit)).all()
+    tasks = _task_dicts(rows, fields)
+    if len(rows) < limit:
+        return tasks, None
+    return tasks, (rows[-1][-1], tasks[-1]["id"])
+
+
+def encode_task_cursor(sort: str, position: tuple) -> str:
+    value, task_id = position
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, task_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_task_cursor(cursor: str, sort: str, sort_key: Optional[str]) -> tuple:
+    """Turn a cursor back into an ``after`` position
+    
+    Raises ValueError if the cursor is malformed or was issued for a
+    different sort order.
+    """
+    try:
+        cursor_sort, value, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort or not isinstance(task_id, int):
+            raise ValueError("Cursor does not match this sort order")
+        if sort_key == "due_date":
+            value = date.fromisoformat(value)
+        elif sort_key == "updated_at":
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    return value, task_id
+
+
+def task_list_version(db: Session, *criteria) -> tuple:
+    """Cheap change markers for a task list, computed without loading rows
+    
+    Any insert, update or visibility change moves the count, id sum or
+    latest updated_at; project and assignee renames show up through the
+    projects' and users' own updated_at.
+    """
+    task_version = db.execute(
+        select(func.count(Task.id), func.sum(Task.id), func.max(Task.updated_at)).where(*criteria)
+    ).one()
+    related_version = db.execute(
+        select(
+            select(func.max(Project.updated_at)).where(
+                Project.id.in_(select(Task.project_id).where(*criteria))
+            ).scalar_subquery(),
+            select(func.max(User.updated_at)).where(
+                User.id.in_(select(Task.assignee_id).where(*criteria))
+            ).scalar_subquery(),
+        )
+    ).one()
+    return (*task_version, *related_version)
+
+
+def mark_overdue_tasks(db: Session, *criteria) -> int:
+    """Flag past-due, unfinished tasks as overdue in a single UPDATE"""
+    overdue = db.execute(
+        select(Task.id, Task.project_id, Task.created_by_id, Task.assignee_id).where(
+            *criteria,
+            Task.due_date < date.today(),
+            Task.status.notin_([TaskStatus.COMPLETED, TaskStatus.OVERDUE])
+        )
+    ).all()
+    if not overdue:
+        return 0
+    
+    db.query(Task).filter(
+        Task.id.in_([task.id for task in overdue]),
+        Task.status.notin_([TaskStatus.COMPLETED, TaskStatus.OVERDUE])
+    ).update(
+        {Task.status: TaskStatus.OVERDUE, Task.change_seq: next_change_seq(db)},
+        synchronize_session=False
+    )
+    db.commit()
+    
+    invalidate_dashboards(set().union(*task_audiences(db, overdue).values()))
+    return len(overdue)
@@ -1,12 +1,43 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import engine, Base
-from app.api.v1 import auth, users, projects, tasks, settings as settings_router, ai_chat
+from app.api.v1 import auth, users, projects, tasks, settings as settings_router, ai_chat, events, dashboard, exports, imports, archive, batch
+from app.core.pubsub import broker
+from app.core.events import hub
+from app.core.idempotency import IdempotencyMiddleware, purge_expired_keys_forever
+from app.core.write_behind import flush_all, flush_forever
+from app.core.revocation import refresh_revocations_forever
+from app.crud.refresh_tokens import purge_expired_refresh_tokens_forever
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start delivering live events on this worker
+    hub.attach(asyncio.get_running_loop())
+    broker.start()
+    purge = asyncio.create_task(purge_expired_keys_forever(settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS))
+    flush = asyncio.create_task(flush_forever(settings.WRITE_BEHIND_FLUSH_SECONDS))
+    purge_refresh_tokens = asyncio.create_task(purge_expired_refresh_tokens_forever())
+    revocation_refresh = None
+    if settings.STATELESS_AUTH:
+        revocation_refresh = asyncio.create_task(refresh_revocations_forever(settings.REVOCATION_REFRESH_SECONDS))
+    yield
+    if revocation_refresh:
+        revocation_refresh.cancel()
+    flush.cancel()
+    flush_all()
+    purge_refresh_tokens.cancel()
+    purge.cancel()
+    broker.stop()
+    await settings_router.ai_http_client.aclose()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Task Management API",
@@ -14,7 +45,14 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    lifespan=lifespan
+)
+
+# Replay responses to retried creates instead of running them twice
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=["/api/v1/tasks/", "/api/v1/projects/", "/api/v1/ai/chat"],
 )
 
 # Configure CORS
@@ -24,6 +62,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Idempotent-Replayed"],
 )
 
 # Include routers
@@ -33,6 +72,12 @@ app.include_router(projects.router, prefix="/api/v1/projects", tags=["projects"]
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["tasks"])
 app.include_router(settings_router.router, prefix="/api/v1/settings", tags=["settings"])
 app.include_router(ai_chat.router, prefix="/api/v1/ai", tags=["ai"])
+app.include_router(events.router, prefix="/api/v1/events", tags=["events"])
+app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["dashboard"])
+app.include_router(exports.router, prefix="/api/v1/export", tags=["export"])
+app.include_router(imports.router, prefix="/api/v1/imports", tags=["import"])
+app.include_router(archive.router, prefix="/api/v1/archive", tags=["archive"])
+app.include_router(batch.router, prefix="/api/v1/batch", tags=["batch"])
 
 
 @app.get("/")
@@ -3,6 +3,13 @@ from app.models.project import Project, ProjectMember
 from app.models.task import Task, Tag, task_tags
 from app.models.settings import UserSettings
 from app.models.ai_chat import AIConversation, AIMessage, AITaskSuggestion
+from app.models.sync import ChangeSequence, TaskTombstone
+from app.models import search  # registers the full-text search DDL
+from app.models.imports import ImportJob
+from app.models.idempotency import IdempotencyKey
+from app.models.refresh_token import RefreshToken
+from app.models.rate_limit import RateLimitBucket
+from app.models.archive import ArchivedTask, ArchivedConversation, ArchivedMessage, ArchivedSuggestion, archived_task_tags
 from app.models.enums import ProjectStatus, TaskStatus, Priority
 
 __all__ = [
@@ -16,6 +23,17 @@ __all__ = [
     "AIConversation",
     "AIMessage",
     "AITaskSuggestion",
+    "ChangeSequence",
+    "TaskTombstone",
+    "ImportJob",
+    "IdempotencyKey",
+    "RefreshToken",
+    "RateLimitBucket",
+    "ArchivedTask",
+    "ArchivedConversation",
+    "ArchivedMessage",
+    "ArchivedSuggestion",
+    "archived_task_tags",
     "ProjectStatus",
     "TaskStatus",
     "Priority",
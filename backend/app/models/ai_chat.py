@@ -1,8 +1,33 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum
-from sqlalchemy.orm import relationship
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Text, LargeBinary, ForeignKey, DateTime, Enum, Index
+from sqlalchemy.orm import declared_attr, deferred, relationship
 from datetime import datetime
 from app.database import Base
 from app.models.enums import Priority
+from app.core.compression import pack_text, unpack_text
+
+
+class CompressedContent:
+    """Message content stored plain or compressed (see app.core.compression)
+    
+    ``preview`` maps the content column: the whole text, or its start when
+    the text is compressed into ``content_blob``. The blob is deferred and
+    only loaded when ``content`` is read; undefer it when reading many.
+    """
+    preview = Column("content", Text)
+    content_codec = Column(String(8), nullable=True)
+    
+    @declared_attr
+    def content_blob(cls):
+        return deferred(Column(LargeBinary, nullable=True))
+    
+    @property
+    def content(self) -> Optional[str]:
+        return unpack_text(self.preview, self.content_codec, self.content_blob)
+    
+    @content.setter
+    def content(self, value: Optional[str]) -> None:
+        self.preview, self.content_codec, self.content_blob = pack_text(value)
 
 
 class AIConversation(Base):
@@ -19,25 +44,34 @@ class AIConversation(Base):
     messages = relationship("AIMessage", back_populates="conversation", cascade="all, delete-orphan")
 
 
-class AIMessage(Base):
+class AIMessage(CompressedContent, Base):
+    """One chat turn
+    
+    On Postgres the table is range-partitioned by month of created_at (see
+    app.crud.partitions), with (id, created_at) as its primary key.
+    """
     __tablename__ = "ai_messages"
     
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("ai_conversations.id"))
     role = Column(String)  # "user" or "assistant"
-    content = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     conversation = relationship("AIConversation", back_populates="messages")
     task_suggestions = relationship("AITaskSuggestion", back_populates="message", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # A conversation's history in order, and its latest activity
+        Index("ix_ai_messages_conversation_id_created_at", "conversation_id", "created_at"),
+    )
 
 
 class AITaskSuggestion(Base):
     __tablename__ = "ai_task_suggestions"
     
     id = Column(Integer, primary_key=True, index=True)
-    message_id = Column(Integer, ForeignKey("ai_messages.id"))
+    message_id = Column(Integer, ForeignKey("ai_messages.id"), index=True)
     title = Column(String)
     description = Column(Text)
     priority = Column(Enum(Priority))
@@ -45,6 +79,10 @@ class AITaskSuggestion(Base):
     project_name = Column(String, nullable=True)
     created_task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
     
+    # Partition key on Postgres, where message_id has no foreign key: a
+    # partitioned ai_messages can only be referenced by (id, created_at)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
     # Relationships
     message = relationship("AIMessage", back_populates="task_suggestions")
     created_task = relationship("Task")
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Archive tables for rows moved out of the hot tables by the archive job.
+
+Rows keep their original ids. References to users, projects and tasks are
+plain indexed integers rather than foreign keys, so archived rows never
+block deleting what they point at. Enums are stored as their names in
+VARCHAR columns, which INSERT ... SELECT from the hot tables fills as is.
+"""
+from sqlalchemy import Column, Integer, String, Text, Enum, Date, DateTime, Boolean, ForeignKey, Table
+from datetime import datetime
+from app.database import Base
+from app.models.enums import Priority, TaskStatus
+from app.models.ai_chat import CompressedContent
+
+
+class ArchivedTask(Base):
+    """A completed task moved out of tasks"""
+    __tablename__ = "archived_tasks"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    priority = Column(Enum(Priority, native_enum=False))
+    due_date = Column(Date, nullable=True)
+    status = Column(Enum(TaskStatus, native_enum=False))
+    project_id = Column(Integer, nullable=True, index=True)
+    assignee_id = Column(Integer, nullable=True, index=True)
+    created_by_id = Column(Integer, index=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    completed_at = Column(DateTime, nullable=True)
+    is_inbox = Column(Boolean, default=False)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+archived_task_tags = Table(
+    "archived_task_tags",
+    Base.metadata,
+    Column("task_id", Integer, ForeignKey("archived_tasks.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True)
+)
+
+
+class ArchivedConversation(Base):
+    """An AI conversation, with its messages and suggestions, moved out of the hot tables"""
+    __tablename__ = "archived_ai_conversations"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, index=True)
+    title = Column(String, nullable=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ArchivedMessage(CompressedContent, Base):
+    __tablename__ = "archived_ai_messages"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    conversation_id = Column(
+        Integer, ForeignKey("archived_ai_conversations.id", ondelete="CASCADE"), index=True
+    )
+    role = Column(String)
+    created_at = Column(DateTime)
+
+
+class ArchivedSuggestion(Base):
+    __tablename__ = "archived_ai_task_suggestions"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    message_id = Column(Integer, ForeignKey("archived_ai_messages.id", ondelete="CASCADE"), index=True)
+    title = Column(String)
+    description = Column(Text)
+    priority = Column(Enum(Priority, native_enum=False))
+    estimated_duration = Column(String)
+    project_name = Column(String, nullable=True)
+    created_task_id = Column(Integer, nullable=True)
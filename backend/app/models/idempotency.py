@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, LargeBinary, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """A client's Idempotency-Key and the response it produced
+    
+    The row is inserted before the request runs, so its unique constraint
+    doubles as the lock for concurrent duplicates. status_code stays NULL
+    until the response is stored.
+    """
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # sha256 of method, path and body
+    
+    # Stored response
+    status_code = Column(Integer, nullable=True)
+    headers = Column(JSON, nullable=True)  # [[name, value], ...]
+    body = Column(LargeBinary, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+    )
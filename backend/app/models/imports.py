@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime, JSON
+from datetime import datetime
+from app.database import Base
+
+
+class ImportJob(Base):
+    """Progress and error report of a bulk task import"""
+    __tablename__ = "import_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    filename = Column(String, nullable=True)
+    format = Column(String, nullable=False)  # "csv" or "ndjson"
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    
+    # Progress
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    processed_bytes = Column(BigInteger, nullable=False, default=0)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    created_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    
+    # First errors as [{"row": n, "error": "..."}]; error_count has the total
+    errors = Column(JSON, nullable=False, default=list)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Float, Boolean, DateTime
+from app.database import Base
+
+
+class RateLimitBucket(Base):
+    """A token bucket shared by all workers (RATE_LIMIT_BACKEND=postgres)
+    
+    Written by app.core.ratelimit.PostgresRateLimitStore with a raw upsert.
+    """
+    __tablename__ = "rate_limit_buckets"
+    
+    key = Column(String(255), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    allowed = Column(Boolean, nullable=False)  # outcome of the last request
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, LargeBinary
+from datetime import datetime
+from app.database import Base
+
+
+class RefreshToken(Base):
+    """A single-use refresh token, stored as its HMAC-SHA256
+    
+    Each refresh marks the token used and issues the next one in the same
+    family. Presenting a used token again means it leaked, so the whole
+    family is revoked. A used token's expires_at is cut to the end of the
+    replay window, so the purge removes it soon after.
+    """
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(LargeBinary(32), nullable=False, unique=True)
+    family = Column(String(32), nullable=False, index=True)  # shared by a login's rotated tokens
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    used_at = Column(DateTime, nullable=True)
@@ -0,0 +1,123 @@
+"""
+Full-text search index over task titles, descriptions and tag names.
+
+SQLite keeps an FTS5 table, tasks_fts, whose rowid is the task id.
+Postgres keeps a weighted tsvector in tasks.search_vector with a GIN index.
+In both cases triggers keep the index in sync with tasks, task_tags and
+tags, so application code never writes to it. The DDL runs after
+task_tags is created (the last of the three tables) and mirrors the
+add_task_search migration.
+"""
+from sqlalchemy import DDL, event
+from app.models.task import task_tags
+
+SQLITE_TAG_NAMES = """
+    SELECT coalesce(group_concat(tags.name, ' '), '') FROM tags
+    JOIN task_tags ON task_tags.tag_id = tags.id
+    WHERE task_tags.task_id = {task_id}
+"""
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, tags, tokenize='porter unicode61')",
+    """
+    CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, title, description, tags)
+        VALUES (new.id, new.title, coalesce(new.description, ''), '');
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        UPDATE tasks_fts SET title = new.title, description = coalesce(new.description, '')
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        DELETE FROM tasks_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER task_tags_fts_insert AFTER INSERT ON task_tags BEGIN
+        UPDATE tasks_fts SET tags = ({SQLITE_TAG_NAMES.format(task_id="new.task_id")})
+        WHERE rowid = new.task_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER task_tags_fts_delete AFTER DELETE ON task_tags BEGIN
+        UPDATE tasks_fts SET tags = ({SQLITE_TAG_NAMES.format(task_id="old.task_id")})
+        WHERE rowid = old.task_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER tags_fts_update AFTER UPDATE OF name ON tags BEGIN
+        UPDATE tasks_fts SET tags = ({SQLITE_TAG_NAMES.format(task_id="tasks_fts.rowid")})
+        WHERE rowid IN (SELECT task_id FROM task_tags WHERE tag_id = new.id);
+    END
+    """,
+]
+
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE tasks ADD COLUMN search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION task_search_vector(p_task_id integer, p_title text, p_description text)
+    RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('english', coalesce(p_title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(p_description, '')), 'B')
+            || setweight(to_tsvector('english', coalesce((
+                SELECT string_agg(tags.name, ' ') FROM tags
+                JOIN task_tags ON task_tags.tag_id = tags.id
+                WHERE task_tags.task_id = p_task_id
+            ), '')), 'C')
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION tasks_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := task_search_vector(NEW.id, NEW.title, NEW.description);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER tasks_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_trigger()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_tags_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        UPDATE tasks SET search_vector = task_search_vector(id, title, description)
+        WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.task_id ELSE NEW.task_id END;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER task_tags_search_vector_update
+    AFTER INSERT OR DELETE ON task_tags
+    FOR EACH ROW EXECUTE FUNCTION task_tags_search_vector_trigger()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION tags_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        UPDATE tasks SET search_vector = task_search_vector(id, title, description)
+        WHERE id IN (SELECT task_id FROM task_tags WHERE tag_id = NEW.id);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER tags_search_vector_update
+    AFTER UPDATE OF name ON tags
+    FOR EACH ROW EXECUTE FUNCTION tags_search_vector_trigger()
+    """,
+    "CREATE INDEX ix_tasks_search_vector ON tasks USING gin (search_vector)",
+]
+
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(task_tags, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(task_tags, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+event.listen(
+    task_tags, "after_drop", DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite")
+)
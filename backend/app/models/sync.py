@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, DateTime, Index, event, insert
+from datetime import datetime
+from app.database import Base
+
+
+class ChangeSequence(Base):
+    """Single-row counter handing out monotonic change sequence numbers"""
+    __tablename__ = "change_sequence"
+    
+    id = Column(Integer, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+class TaskTombstone(Base):
+    """Records that a task left a user's visibility at a given change sequence"""
+    __tablename__ = "task_tombstones"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    change_seq = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_task_tombstones_user_id_change_seq", "user_id", "change_seq"),
+    )
+
+
+@event.listens_for(ChangeSequence.__table__, "after_create")
+def _seed_change_sequence(target, connection, **kw):
+    connection.execute(insert(target).values(id=1, value=0))
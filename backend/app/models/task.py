@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Enum, Date, DateTime, Boolean, ForeignKey, Table
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Enum, Date, DateTime, Boolean, ForeignKey, Table, Index, case, func, literal_column
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.elements import Grouping
 from datetime import datetime
 from app.database import Base
 from app.models.enums import Priority, TaskStatus
@@ -10,7 +11,7 @@ task_tags = Table(
     "task_tags",
     Base.metadata,
     Column("task_id", Integer, ForeignKey("tasks.id"), primary_key=True),
-    Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True)
+    Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True, index=True)
 )
 
 
@@ -24,12 +25,13 @@ class Task(Base):
     due_date = Column(Date, nullable=True)
     status = Column(Enum(TaskStatus), default=TaskStatus.OPEN)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
-    assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_by_id = Column(Integer, ForeignKey("users.id"))
+    assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    created_by_id = Column(Integer, ForeignKey("users.id"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
     is_inbox = Column(Boolean, default=False)
+    change_seq = Column(BigInteger, default=0, nullable=False, index=True)
     
     # Relationships
     project = relationship("Project", back_populates="tasks")
@@ -38,6 +40,40 @@ class Task(Base):
     tags = relationship("Tag", secondary=task_tags, back_populates="tasks")
 
 
+# Enum sort orders by meaning; the stored names would sort alphabetically
+PRIORITY_ORDER = (Priority.HIGH, Priority.MEDIUM, Priority.LOW)
+STATUS_ORDER = (TaskStatus.OPEN, TaskStatus.IN_PROGRESS, TaskStatus.OVERDUE, TaskStatus.COMPLETED)
+
+# Tasks without a due date sort after every real date
+NO_DUE_DATE = "9999-12-31"
+
+
+def _rank(column, order):
+    # Literal SQL (no bound parameters) so queries match the expression
+    # indexes, parenthesized as Postgres requires inside CREATE INDEX
+    return Grouping(case(*(
+        (column == literal_column(f"'{member.name}'"), literal_column(str(rank)))
+        for rank, member in enumerate(order)
+    )))
+
+
+# Sort keys for task lists. Each is indexed together with project_id and id
+# so a project's tasks can be paged in any order straight off an index.
+TASK_SORT_EXPRESSIONS = {
+    "due_date": func.coalesce(Task.due_date, literal_column(f"'{NO_DUE_DATE}'")),
+    "priority": _rank(Task.priority, PRIORITY_ORDER),
+    "status": _rank(Task.status, STATUS_ORDER),
+    "title": func.lower(Task.title),
+    "updated_at": Task.updated_at,
+}
+
+for _key, _expression in TASK_SORT_EXPRESSIONS.items():
+    Index(f"ix_tasks_project_id_{_key}", Task.project_id, _expression, Task.id)
+
+# Finds completed tasks old enough for the archive job
+Index("ix_tasks_status_completed_at", Task.status, Task.completed_at)
+
+
 class Tag(Base):
     __tablename__ = "tags"
     
@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark suite.
+
+Boots the FastAPI app in-process against a freshly seeded database, drives
+the main endpoints at a set of concurrency levels and records throughput,
+latency percentiles, CPU time and query counts per request. Results can be
+written out as a new baseline or compared against the committed one.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --users 50 --tasks-per-user 500
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+BENCHMARK_DIR = Path(__file__).parent
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+PASSWORD = "benchmark-password"
+
+# Rows per CSV file in the task_import scenario
+IMPORT_ROWS = 200
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the endpoint benchmark suite")
+    parser.add_argument("--users", type=int, default=20, help="Number of seeded users")
+    parser.add_argument("--projects-per-user", type=int, default=3)
+    parser.add_argument("--tasks-per-user", type=int, default=100)
+    parser.add_argument(
+        "--concurrency", default="1,8",
+        help="Comma separated concurrency levels (default: 1,8)"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200,
+        help="Requests per scenario and concurrency level"
+    )
+    parser.add_argument(
+        "--scenarios", default=None,
+        help="Comma separated subset of scenarios to run"
+    )
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", type=Path, default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline", action="store_true",
+        help="Overwrite the baseline with this run instead of comparing"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="Allowed relative slowdown before a timing metric counts as a regression"
+    )
+    return parser.parse_args()
+
+
+def configure_environment(db_path: str):
+    """Point the app at a throwaway database before it is imported."""
+    os.environ["ENVIRONMENT"] = "development"
+    os.environ["DATABASE_URL_SQLITE"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production-use")
+    # Every request comes from one client, which the limits would throttle
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    if "ENCRYPTION_KEY" not in os.environ:
+        from cryptography.fernet import Fernet
+        os.environ["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+
+
+class QueryCounter:
+    """Counts statements executed on an engine."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+# Planning answers run to a few KB; this one is about 3 KB
+PLAN_STEPS = [
+    "Book the venue and confirm capacity, catering rules and accessibility",
+    "Send invitations with the agenda, travel details and an RSVP deadline",
+    "Order catering for every dietary requirement collected from the RSVPs",
+    "Arrange transport between the hotel, the venue and the airport",
+    "Prepare the workshop materials and test the audio-visual equipment",
+    "Assign an owner to every session and share the run sheet with them",
+]
+STUB_PLAN = "Here is a plan for your event:\n\n" + "\n\n".join(
+    f"Week {week}:\n" + "\n".join(f"{number}. {step}." for number, step in enumerate(PLAN_STEPS, start=1))
+    for week in range(1, 7)
+)
+
+
+class StubCompletions:
+    async def create(self, **kwargs):
+        class Message:
+            content = STUB_PLAN
+
+        class Choice:
+            message = Message()
+
+        class Response:
+            choices = [Choice()]
+
+        return Response()
+
+
+class StubAIClient:
+    """Stands in for the provider SDK so chat benchmarks don't hit the network."""
+
+    def __init__(self):
+        self.chat = type("Chat", (), {"completions": StubCompletions()})()
+
+
+def seed_database(args, rng):
+    """Create users, projects, memberships, tags and tasks in bulk."""
+    from sqlalchemy import insert
+    from app.database import SessionLocal
+    from app.models import User, Project, ProjectMember, Task, Tag, UserSettings, task_tags
+    from app.models.enums import Priority, TaskStatus, ProjectStatus
+    from app.api.v1.auth import get_password_hash
+
+    db = SessionLocal()
+    now = datetime.utcnow()
+    today = date.today()
+    try:
+        # Hash once; every benchmark user shares the same password
+        hashed_password = get_password_hash(PASSWORD)
+        db.execute(insert(User), [
+            {
+                "email": f"bench{i}@example.com",
+                "name": f"Bench User {i}",
+                "hashed_password": hashed_password,
+                "role": "User",
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(args.users)
+        ])
+        user_ids = [row[0] for row in db.query(User.id).order_by(User.id).all()]
+        db.execute(insert(UserSettings), [
+            {"user_id": user_id, "created_at": now, "updated_at": now}
+            for user_id in user_ids
+        ])
+
+        db.execute(insert(Project), [
+            {
+                "name": f"Project {owner_id}-{p}",
+                "description": "Benchmark project",
+                "status": rng.choice(list(ProjectStatus)),
+                "due_date": today + timedelta(days=rng.randint(-10, 90)),
+                "owner_id": owner_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for owner_id in user_ids
+            for p in range(args.projects_per_user)
+        ])
+        projects = db.query(Project.id, Project.owner_id).all()
+
+        # Owner plus two random teammates per project
+        members = set()
+        for project_id, owner_id in projects:
+            members.add((project_id, owner_id))
+            for user_id in rng.sample(user_ids, min(2, len(user_ids))):
+                members.add((project_id, user_id))
+        db.execute(insert(ProjectMember), [
+            {"project_id": project_id, "user_id": user_id, "added_at": now}
+            for project_id, user_id in members
+        ])
+
+        tag_names = ["design", "backend", "frontend", "security", "performance", "testing", "docs", "ops"]
+        db.execute(insert(Tag), [{"name": name, "color": "#6B7280"} for name in tag_names])
+        tag_ids = [row[0] for row in db.query(Tag.id).all()]
+
+        projects_by_owner = {}
+        for project_id, owner_id in projects:
+            projects_by_owner.setdefault(owner_id, []).append(project_id)
+
+        task_rows = []
+        for user_id in user_ids:
+            for t in range(args.tasks_per_user):
+                in_project = rng.random() < 0.7 and projects_by_owner.get(user_id)
+                task_rows.append({
+                    "title": f"Task {user_id}-{t}",
+                    "description": "Benchmark task description " * rng.randint(1, 4),
+                    "priority": rng.choice(list(Priority)),
+                    "due_date": today + timedelta(days=rng.randint(-5, 60)),
+                    "status": rng.choice([TaskStatus.OPEN, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED]),
+                    "project_id": rng.choice(projects_by_owner[user_id]) if in_project else None,
+                    "assignee_id": rng.choice(user_ids),
+                    "created_by_id": user_id,
+                    "is_inbox": not in_project,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+        db.execute(insert(Task), task_rows)
+        task_ids = [row[0] for row in db.query(Task.id).all()]
+        db.execute(insert(task_tags), [
+            {"task_id": task_id, "tag_id": tag_id}
+            for task_id in task_ids
+            for tag_id in rng.sample(tag_ids, rng.randint(0, 2))
+        ])
+        db.commit()
+
+        own_tasks = {}
+        for task_id, created_by_id in db.query(Task.id, Task.created_by_id).all():
+            own_tasks.setdefault(created_by_id, []).append(task_id)
+
+        return {
+            "user_ids": user_ids,
+            "emails": {user_id: f"bench{i}@example.com" for i, user_id in enumerate(user_ids)},
+            "own_tasks": own_tasks,
+            "projects": projects_by_owner,
+            "task_count": len(task_ids),
+        }
+    finally:
+        db.close()
+
+
+def build_scenarios(seed, tokens, rng, refresh_tokens):
+    """Each scenario returns (method, url, kwargs) for the next request."""
+    from app.models.enums import Priority
+
+    user_ids = seed["user_ids"]
+
+    def auth(user_id):
+        return {"Authorization": f"Bearer {tokens[user_id]}"}
+
+    def task_list():
+        user_id = rng.choice(user_ids)
+        return "GET", "/api/v1/tasks/", {"headers": auth(user_id)}
+
+    def task_list_sparse():
+        user_id = rng.choice(user_ids)
+        url = "/api/v1/tasks/?fields=id,title,status,due_date"
+        return "GET", url, {"headers": auth(user_id)}
+
+    def task_page():
+        user_id = rng.choice(user_ids)
+        sort = rng.choice(["due_date", "-priority", "status", "title", "-updated_at"])
+        url = f"/api/v1/tasks/?sort={sort}&limit=25&fields=id,title,status,priority,due_date"
+        return "GET", url, {"headers": auth(user_id)}
+
+    def task_search():
+        user_id = rng.choice(user_ids)
+        q = rng.choice(["backend", "security", "docs", "perf"])
+        return "GET", f"/api/v1/tasks/search?q={q}", {"headers": auth(user_id)}
+
+    def project_list():
+        user_id = rng.choice(user_ids)
+        return "GET", "/api/v1/projects/", {"headers": auth(user_id)}
+
+    def dashboard():
+        user_id = rng.choice(user_ids)
+        return "GET", "/api/v1/dashboard/summary", {"headers": auth(user_id)}
+
+    def bulk_update():
+        user_id = rng.choice(user_ids)
+        own = seed["own_tasks"].get(user_id) or []
+        task_ids = rng.sample(own, min(20, len(own)))
+        body = {"task_ids": task_ids, "priority": rng.choice(list(Priority)).value}
+        return "PUT", "/api/v1/tasks/bulk", {"headers": auth(user_id), "json": body}
+
+    def login():
+        user_id = rng.choice(user_ids)
+        body = {"email": seed["emails"][user_id], "password": PASSWORD}
+        return "POST", "/api/v1/auth/login", {"json": body}
+
+    def token_refresh():
+        # Refresh tokens are single use, so each request takes a fresh one
+        return "POST", "/api/v1/auth/refresh", {"json": {"refresh_token": refresh_tokens.pop()}}
+
+    def task_import():
+        user_id = rng.choice(user_ids)
+        lines = ["title,priority,status,due_date,tags"]
+        for i in range(IMPORT_ROWS):
+            priority = rng.choice(list(Priority)).value
+            lines.append(f"Imported task {i},{priority},Open,2025-07-01,\"perf,import\"")
+        files = {"file": ("tasks.csv", "\n".join(lines).encode(), "text/csv")}
+        return "POST", "/api/v1/imports/tasks", {"headers": auth(user_id), "files": files}
+
+    def project_page():
+        # The calls behind a project page, in one round trip
+        user_id = rng.choice(user_ids)
+        project_id = rng.choice(seed["projects"][user_id])
+        body = {"requests": [
+            {"url": f"/api/v1/projects/{project_id}"},
+            {"url": f"/api/v1/tasks/?project_id={project_id}&fields=id,title,status,priority,due_date"},
+            {"url": "/api/v1/users/me"},
+            {"url": "/api/v1/settings/"},
+        ]}
+        return "POST", "/api/v1/batch", {"headers": auth(user_id), "json": body}
+
+    def chat():
+        user_id = rng.choice(user_ids)
+        body = {"content": "Help me plan a team offsite for 20 people"}
+        return "POST", "/api/v1/ai/chat", {"headers": auth(user_id), "json": body}
+
+    # name -> (request builder, share of --requests to run; bcrypt makes login slow)
+    return {
+        "task_list": (task_list, 1.0),
+        "task_list_sparse": (task_list_sparse, 1.0),
+        "bulk_update": (bulk_update, 1.0),
+        "task_page": (task_page, 1.0),
+        "task_search": (task_search, 1.0),
+        "project_list": (project_list, 1.0),
+        "dashboard": (dashboard, 1.0),
+        "project_page": (project_page, 1.0),
+        "login": (login, 0.25),
+        "token_refresh": (token_refresh, 1.0),
+        "chat": (chat, 1.0),
+        "task_import": (task_import, 0.1),
+    }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, builder, total_requests, concurrency, counter):
+    latencies = []
+    errors = 0
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, kwargs = builder()
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    queries_before = counter.count
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    queries = counter.count - queries_before
+
+    latencies.sort()
+    completed = len(latencies)
+    return {
+        "requests": completed,
+        "errors": errors,
+        "throughput_rps": round(completed / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "cpu_ms_per_request": round(cpu / completed * 1000, 3) if completed else 0.0,
+        "queries_per_request": round(queries / completed, 2) if completed else 0.0,
+    }
+
+
+async def run_benchmarks(args, seed, rng):
+    import httpx
+    from app.main import app
+    from app.database import engine
+    from app.api.v1 import ai_chat
+
+    # Swap in the stub provider for the chat scenario
+    ai_chat.get_ai_client = lambda user_settings: StubAIClient()
+
+    counter = QueryCounter(engine)
+    concurrency_levels = [int(level) for level in args.concurrency.split(",")]
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Log every user in once up front so scenarios can reuse tokens
+        tokens = {}
+        for user_id, email in seed["emails"].items():
+            response = await client.post(
+                "/api/v1/auth/login", json={"email": email, "password": PASSWORD}
+            )
+            response.raise_for_status()
+            tokens[user_id] = response.json()["access_token"]
+
+        count = len(concurrency_levels) * (args.requests + max(concurrency_levels) + 1)
+        refresh_tokens = issue_refresh_tokens(seed, count, rng)
+        scenarios = build_scenarios(seed, tokens, rng, refresh_tokens)
+        if args.scenarios:
+            selected = args.scenarios.split(",")
+            scenarios = {name: scenarios[name] for name in selected}
+
+        results = {}
+        for name, (builder, share) in scenarios.items():
+            results[name] = {}
+            for concurrency in concurrency_levels:
+                total = max(concurrency, int(args.requests * share))
+                # One untimed request warms up caches and lazy imports
+                method, url, kwargs = builder()
+                await client.request(method, url, **kwargs)
+                stats = await run_scenario(client, builder, total, concurrency, counter)
+                results[name][f"c{concurrency}"] = stats
+                print(
+                    f"{name:<17} c={concurrency:<3} {stats['throughput_rps']:>9.1f} req/s  "
+                    f"p50={stats['p50_ms']:>8.2f}ms  p95={stats['p95_ms']:>8.2f}ms  "
+                    f"p99={stats['p99_ms']:>8.2f}ms  cpu={stats['cpu_ms_per_request']:>7.2f}ms  "
+                    f"queries={stats['queries_per_request']:>6.2f}  errors={stats['errors']}"
+                )
+        return results
+
+
+def issue_refresh_tokens(seed, count, rng):
+    """Refresh tokens for random seeded users, issued straight into the database"""
+    from app.database import SessionLocal
+    from app.crud.refresh_tokens import issue_refresh_token
+
+    user_ids = list(seed["emails"])
+    db = SessionLocal()
+    try:
+        refresh_tokens = [issue_refresh_token(db, rng.choice(user_ids)) for _ in range(count)]
+        db.commit()
+        return refresh_tokens
+    finally:
+        db.close()
+
+
+def message_storage():
+    """Bytes of AI message content versus what the database stores and list views read"""
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import undefer
+    from app.database import SessionLocal
+    from app.models.ai_chat import AIMessage
+
+    db = SessionLocal()
+    try:
+        messages = content_bytes = stored_bytes = preview_bytes = 0
+        query = select(AIMessage).options(undefer(AIMessage.content_blob)).execution_options(yield_per=1000)
+        for message in db.scalars(query):
+            messages += 1
+            content_bytes += len(message.content.encode())
+            preview_bytes += len(message.preview.encode())
+            stored_bytes += len(message.preview.encode()) + len(message.content_blob or b"")
+        saved = 100 * (1 - stored_bytes / content_bytes) if content_bytes else 0.0
+        return {
+            "messages": messages,
+            "content_bytes": content_bytes,
+            "stored_bytes": stored_bytes,
+            "preview_bytes": preview_bytes,
+            "saved_pct": round(saved, 1),
+        }
+    finally:
+        db.close()
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of human readable regressions."""
+    regressions = []
+    for name, levels in results.items():
+        for level, stats in levels.items():
+            base = baseline.get("results", {}).get(name, {}).get(level)
+            if not base:
+                continue
+            label = f"{name} {level}"
+            # Query counts are near-deterministic; allow only for sampling noise
+            if stats["queries_per_request"] > base["queries_per_request"] * 1.05 + 0.05:
+                regressions.append(
+                    f"{label}: queries/request {base['queries_per_request']} -> {stats['queries_per_request']}"
+                )
+            for metric in ("p95_ms", "cpu_ms_per_request"):
+                if base[metric] and stats[metric] > base[metric] * (1 + tolerance):
+                    regressions.append(f"{label}: {metric} {base[metric]} -> {stats[metric]}")
+            if base["throughput_rps"] and stats["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+                regressions.append(
+                    f"{label}: throughput_rps {base['throughput_rps']} -> {stats['throughput_rps']}"
+                )
+            if stats["errors"] > base["errors"]:
+                regressions.append(f"{label}: errors {base['errors']} -> {stats['errors']}")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        configure_environment(os.path.join(tmpdir, "benchmark.db"))
+
+        print(f"Seeding {args.users} users with {args.tasks_per_user} tasks each...")
+        from app.database import engine, Base
+        import app.models  # noqa: F401 - register all tables
+        Base.metadata.create_all(bind=engine)
+        seed = seed_database(args, rng)
+
+        results = asyncio.run(run_benchmarks(args, seed, rng))
+        storage = message_storage()
+        if storage["messages"]:
+            print(
+                f"\nai_messages: {storage['messages']} messages, {storage['content_bytes']} content bytes "
+                f"stored as {storage['stored_bytes']} ({storage['saved_pct']}% saved); "
+                f"previews read {storage['preview_bytes']} bytes"
+            )
+
+    config = {
+        "users": args.users,
+        "projects_per_user": args.projects_per_user,
+        "tasks_per_user": args.tasks_per_user,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+    }
+    report = {
+        "config": config,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        },
+        "results": results,
+        "storage": storage,
+    }
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline updated: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config") != config:
+        print("\nWarning: baseline was recorded with a different configuration; comparing anyway.")
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
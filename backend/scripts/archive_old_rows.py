@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Move completed tasks and idle AI conversations into the archive tables.
+
+Runs in batches of one transaction each, so it can be stopped at any time
+and rerun later (e.g. nightly from cron).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from datetime import datetime, timedelta
+from app.config import settings
+from app.database import SessionLocal
+from app.crud.archive import archive_conversations_batch, archive_tasks_batch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Archive old tasks and AI conversations")
+    parser.add_argument(
+        "--task-days", type=int, default=settings.ARCHIVE_TASKS_AFTER_DAYS,
+        help="Archive tasks completed more than this many days ago"
+    )
+    parser.add_argument(
+        "--conversation-days", type=int, default=settings.ARCHIVE_CONVERSATIONS_AFTER_DAYS,
+        help="Archive conversations idle for more than this many days"
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    return parser.parse_args()
+
+
+def archive(batch, cutoff, batch_size, label):
+    db = SessionLocal()
+    try:
+        total = 0
+        while True:
+            moved = batch(db, cutoff, batch_size)
+            if not moved:
+                break
+            total += moved
+            print(f"  {label}: {total} archived")
+        return total
+    finally:
+        db.close()
+
+
+def main():
+    args = parse_args()
+    now = datetime.utcnow()
+    
+    print(f"Archiving tasks completed before {now - timedelta(days=args.task_days):%Y-%m-%d}...")
+    tasks = archive(archive_tasks_batch, now - timedelta(days=args.task_days), args.batch_size, "tasks")
+    
+    print(f"Archiving conversations idle since {now - timedelta(days=args.conversation_days):%Y-%m-%d}...")
+    conversations = archive(
+        archive_conversations_batch, now - timedelta(days=args.conversation_days), args.batch_size, "conversations"
+    )
+    
+    print(f"\nDone: {tasks} tasks and {conversations} conversations archived.")
+
+
+if __name__ == "__main__":
+    main()
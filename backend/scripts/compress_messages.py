@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Compress stored AI message bodies written before compression was enabled.
+
+Walks ai_messages and archived_ai_messages in id order, one committed
+batch at a time, so it is safe to run against a live database and can be
+resumed with --after-id. Rows too short to benefit are left as they are.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import bindparam, func, select, update
+from app.config import settings
+from app.database import SessionLocal
+from app.models.ai_chat import AIMessage
+from app.models.archive import ArchivedMessage
+from app.core.compression import pack_text
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compress long AI message bodies")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this message id")
+    return parser.parse_args()
+
+
+def compress_table(db, model, batch_size, after_id):
+    table = model.__table__
+    # Text shorter than threshold / 4 characters is below the threshold in bytes
+    min_length = settings.COMPRESSION_THRESHOLD_BYTES // 4
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("message_id"))
+        .values(content=bindparam("preview"), content_codec=bindparam("codec"), content_blob=bindparam("blob"))
+    )
+    
+    scanned = compressed = 0
+    while True:
+        rows = db.execute(
+            select(model.id, model.preview)
+            .where(model.id > after_id, model.content_codec.is_(None), func.length(model.preview) >= min_length)
+            .order_by(model.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return scanned, compressed
+        
+        updates = []
+        for message_id, text in rows:
+            preview, codec, blob = pack_text(text)
+            if codec is not None:
+                updates.append({"message_id": message_id, "preview": preview, "codec": codec, "blob": blob})
+        if updates:
+            db.execute(statement, updates)
+        db.commit()
+        
+        after_id = rows[-1].id
+        scanned += len(rows)
+        compressed += len(updates)
+        print(f"  {table.name}: {compressed} of {scanned} compressed (last id {after_id})")
+
+
+def main():
+    args = parse_args()
+    db = SessionLocal()
+    try:
+        for model in (AIMessage, ArchivedMessage):
+            print(f"Compressing {model.__tablename__} with {settings.COMPRESSION_CODEC}...")
+            scanned, compressed = compress_table(db, model, args.batch_size, args.after_id)
+            print(f"  done: {compressed} of {scanned} long messages compressed")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
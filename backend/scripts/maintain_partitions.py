@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Create upcoming monthly partitions of the AI chat tables (PostgreSQL only).
+
+Run daily or weekly, e.g. from cron. With --detach-before, months that end
+on or before the given month are detached and left as standalone tables.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from datetime import datetime
+from app.config import settings
+from app.database import engine
+from app.crud.partitions import PARTITIONED_TABLES, create_partitions, detach_partitions, is_partitioned
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Maintain ai_messages and ai_task_suggestions partitions")
+    parser.add_argument(
+        "--months-ahead", type=int, default=settings.AI_PARTITION_MONTHS_AHEAD,
+        help="Create partitions up to this many months past the current one"
+    )
+    parser.add_argument(
+        "--detach-before", type=lambda value: datetime.strptime(value, "%Y-%m").date(),
+        help="Detach partitions of months before this one (YYYY-MM)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    
+    if engine.dialect.name != "postgresql":
+        print("Partitioning is only used on PostgreSQL. Nothing to do.")
+        return
+    
+    with engine.begin() as conn:
+        unpartitioned = [table for table in PARTITIONED_TABLES if not is_partitioned(conn, table)]
+        if unpartitioned:
+            print(f"Not partitioned: {', '.join(unpartitioned)}. Run the migrations first.")
+            sys.exit(1)
+        
+        for name in create_partitions(conn, args.months_ahead):
+            print(f"Created {name}")
+        if args.detach_before:
+            for name in detach_partitions(conn, args.detach_before):
+                print(f"Detached {name}")
+    
+    print("Partitions are up to date.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Re-encrypt stored API keys with the current ENCRYPTION_KEY.
+
+To rotate, set ENCRYPTION_KEY to a new key and move the previous one to
+OLD_ENCRYPTION_KEYS, deploy, then run this script. It walks user_settings
+in id order, one committed batch at a time, so the API stays online and an
+interrupted run can be resumed with --after-id. Keys already encrypted
+with the current key are skipped, and a key changed by its user while the
+script runs is left as the user wrote it. Once it reports nothing left to
+rotate, the old keys can be removed from OLD_ENCRYPTION_KEYS.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from cryptography.fernet import InvalidToken
+from sqlalchemy import bindparam, or_, select, update
+from app.database import SessionLocal
+from app.models.settings import UserSettings
+from app.api.v1.settings import needs_rotation, rotate_api_key
+
+ENCRYPTED_COLUMNS = ("openai_api_key_encrypted", "anthropic_api_key_encrypted")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Re-encrypt stored API keys with the current encryption key")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this user_settings id")
+    return parser.parse_args()
+
+
+def rotate_batch(db, rows):
+    """Re-encrypt one batch of rows; returns (rotated, unreadable) counts"""
+    table = UserSettings.__table__
+    rotated = unreadable = 0
+    for column in ENCRYPTED_COLUMNS:
+        updates = []
+        for row in rows:
+            old = getattr(row, column)
+            if not old or not needs_rotation(old):
+                continue
+            try:
+                updates.append({"settings_id": row.id, "old": old, "new": rotate_api_key(old)})
+            except InvalidToken:
+                unreadable += 1
+        if updates:
+            # Only replace the value that was read, so a concurrent update wins
+            db.execute(
+                update(table)
+                .where(table.c.id == bindparam("settings_id"), table.c[column] == bindparam("old"))
+                .values({column: bindparam("new")}),
+                updates
+            )
+            rotated += len(updates)
+    db.commit()
+    return rotated, unreadable
+
+
+def main():
+    args = parse_args()
+    db = SessionLocal()
+    after_id = args.after_id
+    scanned = rotated = unreadable = 0
+    try:
+        while True:
+            rows = db.execute(
+                select(UserSettings.id, *(getattr(UserSettings, column) for column in ENCRYPTED_COLUMNS))
+                .where(
+                    UserSettings.id > after_id,
+                    or_(*(getattr(UserSettings, column).isnot(None) for column in ENCRYPTED_COLUMNS))
+                )
+                .order_by(UserSettings.id)
+                .limit(args.batch_size)
+            ).all()
+            if not rows:
+                break
+
+            batch_rotated, batch_unreadable = rotate_batch(db, rows)
+            after_id = rows[-1].id
+            scanned += len(rows)
+            rotated += batch_rotated
+            unreadable += batch_unreadable
+            print(f"  {rotated} keys rotated in {scanned} settings rows (last id {after_id})")
+    finally:
+        db.close()
+
+    print(f"Done: {rotated} keys rotated")
+    if unreadable:
+        print(f"{unreadable} keys could not be decrypted with any configured key and were left as they are")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()